@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+REST analysis service for LegalAI Simplifier
+
+Serves the same engine as the Streamlit UI to integrations over HTTP.
+Engine calls run on a bounded worker pool: once API_CONFIG["max_pending"]
+documents are queued or running, new requests get 429 instead of piling up,
+and a request still unfinished after AI_CONFIG["processing_timeout"] seconds
+gets 504. Documents longer than AI_CONFIG["max_document_length"] have
+their keyword scan split into chunks run in parallel; the other analysis
+stages still run once over the whole text. Every endpoint takes one
+document as {"text": ...} or a batch as
+{"documents": [{"id": ..., "text": ...}, ...]}; an invalid document in a
+batch gets its own error item instead of failing the whole request.
+
+Usage:
+    python api.py --port 8000
+    curl -d '{"text": "..."}' http://127.0.0.1:8000/v1/analyze
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from cache import AnalysisCache
+from chunking import ChunkedAnalyzer
+from classifier import GENERAL_TYPE, get_document_classifier
+from config import AI_CONFIG, API_CONFIG, DOCUMENT_TYPES
+from engine import LegalAIEngine
+from metrics import track
+from retrieval import RetrievalIndex
+from storage import get_shared_storage
+from utils import DataExporter, RiskAssessor, SessionManager, VoiceInterface
+
+# A unit of work: called on a worker thread with the request's cancel event
+Call = Callable[[threading.Event], Any]
+
+
+class APIError(Exception):
+    """Request failure reported to the client with an HTTP status"""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class AnalysisService:
+    """Engine operations on a bounded worker pool with admission control"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: Optional[float] = None, engine: Optional[LegalAIEngine] = None,
+                 cache: Optional[AnalysisCache] = None):
+        self.workers = workers or API_CONFIG["workers"]
+        self.max_pending = max_pending or API_CONFIG["max_pending"]
+        self.timeout = timeout or AI_CONFIG["processing_timeout"]
+        self.engine = engine or LegalAIEngine()
+        self.chunked = ChunkedAnalyzer(self.engine)
+        self.cache = cache or AnalysisCache(storage=get_shared_storage())
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-worker")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_batch(self) -> int:
+        """Largest batch that can ever be admitted"""
+        return min(API_CONFIG["max_batch"], self.max_pending)
+
+    @property
+    def pending(self) -> int:
+        """Documents queued or running"""
+        return self._pending
+
+    def _admit(self, count: int):
+        """Reserve pool capacity for count documents or refuse with 429"""
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                raise APIError(429, "Server is busy, retry later",
+                               {"Retry-After": str(API_CONFIG["retry_after"])})
+            self._pending += count
+
+    def _release(self, _future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, calls: List[Call]) -> List[Any]:
+        """Run calls on the pool; results or exceptions in order
+
+        Capacity is held until a call actually stops, so a timed-out analysis
+        still counts against max_pending until it notices the cancel event.
+        """
+        self._admit(len(calls))
+        cancel_event = threading.Event()
+        futures = []
+        for call in calls:
+            future = self._executor.submit(call, cancel_event)
+            future.add_done_callback(self._release)
+            futures.append(future)
+
+        try:
+            return await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(future) for future in futures), return_exceptions=True),
+                self.timeout
+            )
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+            raise APIError(504, f"Analysis took longer than {self.timeout:g}s")
+
+    @staticmethod
+    def classify(text: str) -> Dict:
+        probabilities = get_document_classifier().probabilities(text)
+        document_type = max(probabilities, key=probabilities.get)
+        return {"document_type": document_type, "confidence": probabilities[document_type],
+                "probabilities": probabilities}
+
+    def analyze(self, text: str, document_type: Optional[str], preferences: Dict,
+                cancel_event: threading.Event) -> Dict:
+        def compute():
+            if len(text) > AI_CONFIG["max_document_length"]:
+                return self.chunked.classify_and_analyze(
+                    text, cancel_event=cancel_event, doc_type=document_type
+                )[1]
+            doc_type = document_type or self.engine.classify_document(text)[0]
+            return self.engine.analyze_document(text, doc_type, cancel_event=cancel_event)
+
+        # A forced type changes the analysis, so it is part of the cache key
+        return self.cache.get_or_compute(text, {**preferences, "document_type": document_type or ""}, compute)
+
+    def risk(self, text: str, document_type: Optional[str]) -> Dict:
+        doc_type = document_type or self.engine.classify_document(text)[0]
+        return {"document_type": doc_type, "risks": RiskAssessor.assess_document_risk(text, doc_type)}
+
+    @staticmethod
+    def question(text: str, question: str) -> Dict:
+        return VoiceInterface.process_voice_question(question, RetrievalIndex(text))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.chunked.shutdown()
+
+
+def _document_call(service: AnalysisService, endpoint: str, document: Dict, defaults: Dict) -> Call:
+    """Validate one document and bind it to the endpoint's operation"""
+    text = document.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise APIError(400, "Each document needs a non-empty 'text' string")
+    if len(text) > AI_CONFIG["max_chunked_length"]:
+        raise APIError(413, f"Document exceeds {AI_CONFIG['max_chunked_length']:,} characters")
+
+    document_type = document.get("document_type", defaults.get("document_type"))
+    if document_type is not None and document_type not in DOCUMENT_TYPES and document_type != GENERAL_TYPE:
+        known = ", ".join([*DOCUMENT_TYPES, GENERAL_TYPE])
+        raise APIError(400, f"Unknown 'document_type' {document_type!r}; expected one of {known}")
+    if endpoint == "classify":
+        return lambda cancel_event: service.classify(text)
+    if endpoint == "analyze":
+        preferences = [defaults.get("preferences", {}), document.get("preferences", {})]
+        if not all(isinstance(item, dict) for item in preferences):
+            raise APIError(400, "'preferences' must be a JSON object")
+        preferences = {**SessionManager.DEFAULT_PREFERENCES, **preferences[0], **preferences[1]}
+        return lambda cancel_event: service.analyze(text, document_type, preferences, cancel_event)
+    if endpoint == "risk":
+        return lambda cancel_event: service.risk(text, document_type)
+
+    question = document.get("question", defaults.get("question"))
+    if not isinstance(question, str) or not question.strip():
+        raise APIError(400, "A 'question' string is required")
+    return lambda cancel_event: service.question(text, question)
+
+
+def _json_response(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    # DataExporter's encoder handles the NumPy scalars in engine results
+    return Response(DataExporter.export_to_json(payload, indent=None), status, headers,
+                    media_type="application/json")
+
+
+def _endpoint(service: AnalysisService, endpoint: str):
+    """Request handler for one engine operation"""
+    async def handle(request: Request) -> Response:
+        try:
+            try:
+                body = await request.json()
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise APIError(400, "Request body must be JSON")
+            if not isinstance(body, dict):
+                raise APIError(400, "Request body must be a JSON object")
+
+            batch = body.get("documents")
+            if batch is None:
+                documents = [body]
+            elif not isinstance(batch, list) or not batch or not all(isinstance(doc, dict) for doc in batch):
+                raise APIError(400, "'documents' must be a non-empty list of objects")
+            elif len(batch) > service.max_batch:
+                raise APIError(413, f"Batches are limited to {service.max_batch} documents")
+            else:
+                documents = batch
+
+            # An invalid document in a batch fails on its own; the rest still run
+            calls, rejected = [], {}
+            for position, document in enumerate(documents):
+                try:
+                    calls.append(_document_call(service, endpoint, document, body))
+                except APIError as e:
+                    if batch is None:
+                        raise
+                    rejected[position] = e
+            results = []
+            if calls:
+                with track(f"api_{endpoint}"):
+                    results = await service.run(calls)
+        except APIError as e:
+            return _json_response({"error": str(e)}, e.status, e.headers)
+
+        if batch is None:
+            if isinstance(results[0], Exception):
+                return _json_response({"error": str(results[0])}, 500)
+            return _json_response(results[0])
+
+        items = []
+        completed = iter(results)
+        for position, document in enumerate(documents):
+            if position in rejected:
+                item = {"error": str(rejected[position]), "status": rejected[position].status}
+            else:
+                result = next(completed)
+                item = {"error": str(result)} if isinstance(result, Exception) else {"result": result}
+            if "id" in document:
+                item = {"id": document["id"], **item}
+            items.append(item)
+        return _json_response({"results": items})
+
+    return handle
+
+
+def create_app(service: Optional[AnalysisService] = None) -> Starlette:
+    """ASGI application serving the engine"""
+    service = service or AnalysisService()
+
+    async def health(request: Request) -> Response:
+        return _json_response({"status": "ok", "pending": service.pending, "workers": service.workers})
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        yield
+        service.shutdown()
+
+    routes = [Route("/health", health)] + [
+        Route(f"/v1/{endpoint}", _endpoint(service, endpoint), methods=["POST"])
+        for endpoint in ("classify", "analyze", "risk", "question")
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the LegalAI Simplifier engine over HTTP")
+    parser.add_argument("--host", default=API_CONFIG["host"])
+    parser.add_argument("--port", type=int, default=API_CONFIG["port"])
+    parser.add_argument("--workers", type=int, default=API_CONFIG["workers"], help="engine calls run at once")
+    parser.add_argument("--max-pending", type=int, default=API_CONFIG["max_pending"],
+                        help="documents queued or running before requests get 429")
+    args = parser.parse_args(argv)
+
+    uvicorn.run(create_app(AnalysisService(args.workers, args.max_pending)), host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
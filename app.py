@@ -1,16 +1,20 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime
-import time
-import json
 import hashlib
-import io
-import base64
-from typing import Dict, List, Tuple, Optional
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import plotly.express as px
+import time
+from typing import Dict
+
+from cache import AnalysisCache
+from chunking import ChunkedAnalyzer
+from config import AI_CONFIG
+from engine import LegalAIEngine
+from figures import confidence_gauge_json, load_figure, static_chart_json
+from incremental import IncrementalAnalyzer
+from jobs import CANCELLED, DONE, FAILED, Job, JobQueue
+from metrics import REGISTRY, STAGE_SECONDS, is_enabled, serve_metrics, set_enabled, timed, track
+from retrieval import RetrievalIndex
+from startup import IMPORT_TIMES, lazy_import
+from storage import get_shared_storage
+from utils import DataExporter, DocumentProcessor, SessionManager, VoiceInterface
 
 # Configure Streamlit page
 st.set_page_config(
@@ -93,144 +97,30 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Simulated AI models and databases
-class LegalAIEngine:
-    def __init__(self):
-        self.legal_knowledge_base = {
-            "nda": {
-                "common_clauses": ["confidentiality", "non-disclosure", "return of materials", "term duration", "exceptions"],
-                "risk_patterns": ["perpetual term", "broad definition", "unlimited liability", "no exceptions"],
-                "jurisdiction_data": {"california": "Strong employee protection", "texas": "Employer-friendly", "new_york": "Balanced approach"}
-            },
-            "lease": {
-                "common_clauses": ["rent amount", "security deposit", "maintenance", "termination", "pets"],
-                "risk_patterns": ["no maintenance responsibility", "excessive fees", "automatic renewal", "broad landlord rights"],
-                "jurisdiction_data": {"california": "Strong tenant protection", "texas": "Landlord-friendly", "new_york": "Rent stabilized"}
-            },
-            "employment": {
-                "common_clauses": ["compensation", "benefits", "termination", "non-compete", "intellectual property"],
-                "risk_patterns": ["at-will termination", "broad non-compete", "no severance", "IP assignment"],
-                "jurisdiction_data": {"california": "Non-compete banned", "texas": "At-will state", "new_york": "Restrictive non-compete"}
-            }
-        }
-
-    def classify_document(self, text: str) -> Tuple[str, float]:
-        """Classify document type with confidence"""
-        text_lower = text.lower()
-
-        # Simple classification logic
-        if any(word in text_lower for word in ["nda", "non-disclosure", "confidential"]):
-            return "nda", np.random.uniform(0.85, 0.98)
-        elif any(word in text_lower for word in ["lease", "rent", "tenant", "landlord"]):
-            return "lease", np.random.uniform(0.80, 0.95)
-        elif any(word in text_lower for word in ["employment", "employee", "job", "salary"]):
-            return "employment", np.random.uniform(0.75, 0.92)
-        else:
-            return "contract", np.random.uniform(0.60, 0.85)
-
-    def analyze_document(self, text: str, doc_type: str) -> Dict:
-        """Analyze document and return structured results"""
-
-        # Simulate processing time
-        time.sleep(2)
-
-        # Generate confidence score
-        base_confidence = np.random.uniform(0.75, 0.98)
-
-        # Extract key information
-        analysis = {
-            "document_type": doc_type,
-            "confidence_score": base_confidence,
-            "risk_assessment": self._assess_risks(text, doc_type),
-            "key_clauses": self._extract_clauses(text, doc_type),
-            "plain_language_summary": self._generate_summary(text, doc_type),
-            "source_citations": self._generate_citations(text),
-            "recommendations": self._generate_recommendations(doc_type)
-        }
-
-        return analysis
-
-    def _assess_risks(self, text: str, doc_type: str) -> List[Dict]:
-        """Assess risk levels of clauses"""
-        risks = []
+# Initialize AI engine
+@st.cache_resource
+def get_ai_engine():
+    return LegalAIEngine()
 
-        if doc_type == "nda":
-            risks = [
-                {"clause": "Confidentiality Definition", "risk": "medium", "confidence": 0.87, "explanation": "Definition is somewhat broad but reasonable for standard business use"},
-                {"clause": "Term Duration", "risk": "low", "confidence": 0.94, "explanation": "Standard 2-year term with reasonable exceptions"},
-                {"clause": "Return of Materials", "risk": "low", "confidence": 0.91, "explanation": "Clear obligations for document return upon termination"}
-            ]
-        elif doc_type == "lease":
-            risks = [
-                {"clause": "Security Deposit", "risk": "high", "confidence": 0.82, "explanation": "Deposit amount exceeds local legal limits and lacks clear return conditions"},
-                {"clause": "Maintenance Responsibility", "risk": "medium", "confidence": 0.89, "explanation": "Some maintenance responsibilities shifted to tenant beyond normal wear"},
-                {"clause": "Pet Policy", "risk": "low", "confidence": 0.95, "explanation": "Reasonable pet policy with standard deposit requirements"}
-            ]
-        else:
-            risks = [
-                {"clause": "General Terms", "risk": "medium", "confidence": 0.85, "explanation": "Standard contract terms with some areas requiring attention"}
-            ]
+# Shares the engine above; its scan worker pool is started once per process
+@st.cache_resource
+def get_chunked_analyzer():
+    return ChunkedAnalyzer(get_ai_engine())
 
-        return risks
-
-    def _extract_clauses(self, text: str, doc_type: str) -> List[Dict]:
-        """Extract key clauses from document"""
-        if doc_type in self.legal_knowledge_base:
-            clauses = []
-            for clause in self.legal_knowledge_base[doc_type]["common_clauses"]:
-                clauses.append({
-                    "name": clause.title(),
-                    "content": f"[Sample clause content for {clause}]",
-                    "importance": np.random.choice(["high", "medium", "low"]),
-                    "page_reference": f"Page {np.random.randint(1, 5)}"
-                })
-            return clauses
-        return []
-
-    def _generate_summary(self, text: str, doc_type: str) -> str:
-        """Generate plain language summary"""
-        summaries = {
-            "nda": "This is a Non-Disclosure Agreement that prevents you from sharing confidential information. Key points: You must keep business information secret for 2 years, return all documents when done, and there are standard exceptions for public information.",
-            "lease": "This is a rental agreement for an apartment or house. Key points: Monthly rent is due on the 1st, security deposit required, tenant responsible for some maintenance, standard termination notice required.",
-            "employment": "This is an employment contract outlining your job terms. Key points: Salary and benefits detailed, at-will employment meaning either party can terminate, some restrictions on working for competitors.",
-            "contract": "This appears to be a general business contract. The document outlines mutual obligations, payment terms, and standard legal protections for both parties."
-        }
-        return summaries.get(doc_type, summaries["contract"])
-
-    def _generate_citations(self, text: str) -> List[str]:
-        """Generate source citations"""
-        return [
-            "Section 2.1: Confidentiality Obligations",
-            "Section 4.3: Term and Termination",
-            "Exhibit A: Permitted Disclosures",
-            "Section 7.2: Return of Materials"
-        ]
+# Shared across sessions so re-uploaded templates skip re-analysis
+@st.cache_resource
+def get_analysis_cache():
+    return AnalysisCache(storage=get_shared_storage())
 
-    def _generate_recommendations(self, doc_type: str) -> List[str]:
-        """Generate actionable recommendations"""
-        recommendations = {
-            "nda": [
-                "Consider negotiating a shorter term (1 year instead of 2)",
-                "Request clarification on what constitutes 'confidential information'",
-                "Ensure mutual confidentiality if you're sharing information too"
-            ],
-            "lease": [
-                "Verify security deposit amount complies with local laws",
-                "Document existing damage before move-in",
-                "Understand your rights regarding maintenance and repairs"
-            ],
-            "employment": [
-                "Review non-compete restrictions carefully",
-                "Understand your benefits eligibility timeline",
-                "Clarify intellectual property ownership policies"
-            ]
-        }
-        return recommendations.get(doc_type, ["Review document with legal counsel if terms seem unfavorable"])
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
 
-# Initialize AI engine
+# Prometheus endpoint, started once per process when metrics are enabled;
+# None when another process on this host already holds the port
 @st.cache_resource
-def get_ai_engine():
-    return LegalAIEngine()
+def get_metrics_server():
+    return serve_metrics()
 
 # Main app layout
 def main():
@@ -243,34 +133,57 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
+    if is_enabled():
+        get_metrics_server()
+
     # Initialize session state
     if "analysis_results" not in st.session_state:
         st.session_state.analysis_results = None
     if "voice_question" not in st.session_state:
         st.session_state.voice_question = ""
-    if "processing" not in st.session_state:
-        st.session_state.processing = False
+    if "retrieval_index" not in st.session_state:
+        st.session_state.retrieval_index = None
+    if "analysis_job_id" not in st.session_state:
+        st.session_state.analysis_job_id = None
+    if "pdf_job_id" not in st.session_state:
+        st.session_state.pdf_job_id = None
+    if "incremental_analyzer" not in st.session_state:
+        # Remembers per-clause results so edits only rescan and rescore changed clauses
+        st.session_state.incremental_analyzer = IncrementalAnalyzer(get_ai_engine(), get_chunked_analyzer())
+    SessionManager.initialize_session()
 
     # Sidebar for user preferences
     with st.sidebar:
         st.header("⚙️ Settings")
 
+        preferences = SessionManager.get_user_preferences()
+
+        user_types = ["Small Business Owner", "Tenant/Renter", "Freelancer", "HR Manager", "Law Student", "Other"]
         user_type = st.selectbox(
             "I am a:",
-            ["Small Business Owner", "Tenant/Renter", "Freelancer", "HR Manager", "Law Student", "Other"]
+            user_types,
+            index=user_types.index(preferences["user_type"]) if preferences["user_type"] in user_types else 0
         )
 
         complexity_level = st.select_slider(
             "Explanation Complexity:",
             options=["Simple", "Moderate", "Detailed", "Legal Expert"],
-            value="Moderate"
+            value=preferences["complexity_level"]
         )
 
+        jurisdictions = ["California", "Texas", "New York", "Florida", "Other"]
         jurisdiction = st.selectbox(
             "Legal Jurisdiction:",
-            ["California", "Texas", "New York", "Florida", "Other"]
+            jurisdictions,
+            index=jurisdictions.index(preferences["jurisdiction"]) if preferences["jurisdiction"] in jurisdictions else 0
         )
 
+        SessionManager.update_user_preferences({
+            "user_type": user_type,
+            "complexity_level": complexity_level,
+            "jurisdiction": jurisdiction
+        })
+
         st.markdown("---")
 
         # Privacy controls
@@ -286,25 +199,82 @@ def main():
         st.metric("Avg Confidence", "91.2%")
         st.metric("User Satisfaction", "4.8/5.0")
 
-    # Main content tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📄 Document Analysis", "🎙️ Voice Interface", "📊 Features Demo", "🏢 Business Case"])
-
-    with tab1:
-        document_analysis_tab()
-
-    with tab2:
-        voice_interface_tab()
-
-    with tab3:
-        features_demo_tab()
-
-    with tab4:
-        business_case_tab()
+    # Main content tabs; only the selected tab runs where Streamlit supports it,
+    # so the demo and business tabs load pandas/plotly only when opened
+    tab_names = ["📄 Document Analysis", "🎙️ Voice Interface", "📊 Features Demo", "🏢 Business Case"]
+    try:
+        tabs = st.tabs(tab_names, key="main_tab", on_change="rerun")
+    except TypeError:
+        tabs = st.tabs(tab_names)
+
+    tab_views = [document_analysis_tab, voice_interface_tab, features_demo_tab, business_case_tab]
+    for tab, view in zip(tabs, tab_views):
+        # open is None when tab state isn't tracked, in which case every tab renders
+        if getattr(tab, "open", None) is not False:
+            with tab:
+                view()
+
+    # Hidden debug panel, opened with ?debug=1
+    if st.query_params.get("debug") == "1":
+        debug_metrics_panel()
+
+def debug_metrics_panel():
+    """Show per-stage latency and cache metrics"""
+    with st.expander("🛠️ Debug Metrics", expanded=True):
+        enabled = st.checkbox("Collect metrics", value=is_enabled())
+        if enabled != is_enabled():
+            set_enabled(enabled)
+        if not enabled:
+            st.info("Metrics collection is off (set LEGALAI_METRICS=1 to enable at startup)")
+            return
+
+        pd = lazy_import("pandas")
+        stages = STAGE_SECONDS.snapshot()
+        if stages:
+            st.dataframe(pd.DataFrame([
+                {
+                    "Stage": stage,
+                    "Calls": summary["count"],
+                    "Mean (ms)": round(summary["mean"] * 1000, 2),
+                    "p50 ≤ (ms)": summary["p50"] * 1000,
+                    "p99 ≤ (ms)": summary["p99"] * 1000
+                }
+                for (stage,), summary in sorted(stages.items())
+            ]), use_container_width=True)
+
+        st.json(get_analysis_cache().stats())
+        if IMPORT_TIMES:
+            st.json({module: f"{seconds * 1000:.1f} ms" for module, seconds in IMPORT_TIMES.items()})
+        st.code(REGISTRY.render(), language="text")
+
+def document_key(document_text: str) -> str:
+    """Content hash identifying the document an index was built from"""
+    return hashlib.sha256(document_text.encode("utf-8", "surrogatepass")).hexdigest()
+
+def read_upload(uploaded_file) -> str:
+    """Text of an uploaded file, extracted once rather than on every rerun
+
+    The text (or extraction error) is kept only while the same upload is
+    attached to the uploader, which holds the file itself for that long.
+    """
+    cached = st.session_state.get("uploaded_document")
+    if cached is None or cached[0] != uploaded_file.file_id:
+        try:
+            # Contracts beyond max_document_length are analyzed in chunks
+            cached = (uploaded_file.file_id, DocumentProcessor.read_uploaded_document(
+                uploaded_file, max_chars=AI_CONFIG["max_chunked_length"]
+            ), None)
+        except ValueError as e:
+            cached = (uploaded_file.file_id, "", e)
+        st.session_state.uploaded_document = cached
+
+    _, text, error = cached
+    if error is not None:
+        raise error
+    return text
 
 def document_analysis_tab():
     """Main document analysis interface"""
-    ai_engine = get_ai_engine()
-
     col1, col2 = st.columns([1, 2])
 
     with col1:
@@ -317,16 +287,20 @@ def document_analysis_tab():
         )
 
         document_text = ""
+        uploaded_file = None
 
         if upload_type == "File Upload":
             uploaded_file = st.file_uploader(
                 "Choose a document",
-                type=["pdf", "txt", "docx"],
-                help="Upload PDF, Word, or text files"
+                type=["pdf", "txt", "docx", "png", "jpg", "jpeg", "tif", "tiff"],
+                help="Upload PDF, Word, text files or scanned pages"
             )
 
             if uploaded_file:
-                document_text = f"Sample legal document content from {uploaded_file.name}..."
+                try:
+                    document_text = read_upload(uploaded_file)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
 
         elif upload_type == "Sample Document":
             sample_type = st.selectbox(
@@ -400,21 +374,29 @@ def document_analysis_tab():
                 placeholder="Paste your legal document text here..."
             )
 
-        # Analysis button
-        if st.button("🔍 Analyze Document", type="primary", disabled=not document_text):
-            st.session_state.processing = True
-
-            with st.spinner("Processing document..."):
-                # Document classification
-                doc_type, class_confidence = ai_engine.classify_document(document_text)
+        if uploaded_file is None:
+            # Extracted text is kept only while its upload is attached
+            st.session_state.pop("uploaded_document", None)
+        if st.session_state.retrieval_index is not None and (
+                not document_text or st.session_state.get("retrieval_document") != document_key(document_text)):
+            # The question index goes when the document it was built from does
+            st.session_state.retrieval_index = None
 
-                # Full analysis
-                analysis = ai_engine.analyze_document(document_text, doc_type)
-                st.session_state.analysis_results = analysis
-                st.session_state.processing = False
+        # Analysis button
+        analysis_running = st.session_state.analysis_job_id is not None
+        if st.button("🔍 Analyze Document", type="primary", disabled=not document_text or analysis_running):
+            st.session_state.analysis_job_id = start_analysis_job(
+                document_text, SessionManager.get_user_preferences(), st.session_state.incremental_analyzer
+            )
 
     with col2:
-        if st.session_state.analysis_results:
+        notice = st.session_state.pop("analysis_notice", None)
+        if notice:
+            st.warning(f"⚠️ {notice}")
+
+        if st.session_state.analysis_job_id is not None:
+            analysis_progress_panel()
+        elif st.session_state.analysis_results:
             display_analysis_results(st.session_state.analysis_results)
         else:
             st.info("👆 Upload a document to see AI analysis with confidence scoring")
@@ -439,6 +421,88 @@ def document_analysis_tab():
             </div>
             """, unsafe_allow_html=True)
 
+def start_analysis_job(document_text: str, preferences: Dict, analyzer: IncrementalAnalyzer) -> str:
+    """Queue classification and analysis of a document, returning the job ID"""
+    ai_engine = get_ai_engine()
+    cache = get_analysis_cache()
+
+    def run_analysis(job: Job) -> Dict:
+        clause_index = None
+
+        def compute():
+            nonlocal clause_index
+            # Classification and analysis, reporting each stage as it finishes;
+            # clauses unchanged since this session's last analysis aren't rescanned or rescored
+            _, analysis = analyzer.classify_and_analyze(
+                document_text, on_stage=job.report, cancel_event=job.cancel_event
+            )
+            clause_index = analyzer.clause_index
+            return analysis
+
+        analysis = cache.get_or_compute(document_text, preferences, compute)
+
+        # Built once per analyzed document from the analysis's own clause index
+        # (segmented here only on a cache hit) and reused by every voice question
+        return {
+            "analysis": analysis,
+            "retrieval_index": RetrievalIndex(document_text, clause_index),
+            "document_key": document_key(document_text)
+        }
+
+    return get_job_queue().submit(run_analysis, total_stages=len(ai_engine.pipeline.stages) + 1)
+
+@st.fragment(run_every=0.5)
+def analysis_progress_panel():
+    """Poll the running analysis job, showing results as stages complete"""
+    queue = get_job_queue()
+    job = queue.get(st.session_state.analysis_job_id)
+    if job is None:
+        st.session_state.analysis_job_id = None
+        st.rerun()
+
+    snapshot = job.snapshot()
+    if snapshot["status"] == DONE:
+        st.session_state.analysis_results = snapshot["result"]["analysis"]
+        SessionManager.save_analysis(st.session_state.analysis_results)
+        st.session_state.pdf_job_id = None
+        st.session_state.retrieval_index = snapshot["result"]["retrieval_index"]
+        st.session_state.retrieval_document = snapshot["result"]["document_key"]
+        st.session_state.analysis_job_id = None
+        st.rerun()
+    if snapshot["status"] in (CANCELLED, FAILED):
+        st.session_state.analysis_job_id = None
+        st.session_state.analysis_notice = (
+            "Analysis cancelled" if snapshot["status"] == CANCELLED else f"Analysis failed: {snapshot['error']}"
+        )
+        st.rerun()
+
+    stage_label = snapshot["stage"].replace("_", " ") or "waiting for a worker"
+    st.progress(snapshot["progress"], text=f"⏳ Analyzing document... ({stage_label})")
+    if st.button("✖️ Cancel Analysis"):
+        queue.cancel(job.job_id)
+
+    # Partial results in reading order: classification, then risks, then clauses
+    partial = snapshot["partial"]
+    if "document_type" in partial:
+        st.header(f"📋 Analysis Results - {partial['document_type'].upper()}")
+    if "risk_assessment" in partial:
+        st.markdown("### ⚠️ Risk Assessment")
+        for risk in partial["risk_assessment"]:
+            st.markdown(f"**{risk['clause']}** ({risk['risk']} risk) - {risk['explanation']}")
+    if "key_clauses" in partial:
+        st.markdown("### 📑 Key Clauses")
+        for clause in partial["key_clauses"]:
+            st.markdown(f"**{clause['name']}** ({clause['page_reference']})")
+
+@st.fragment(run_every=0.5)
+def pdf_export_progress():
+    """Wait for the PDF report job, rerunning the page once it is ready"""
+    job = get_job_queue().get(st.session_state.pdf_job_id)
+    if job is None or job.done:
+        st.rerun()
+    st.caption("⏳ Rendering PDF report...")
+
+@timed("display_analysis_results")
 def display_analysis_results(analysis):
     """Display comprehensive analysis results"""
 
@@ -448,8 +512,9 @@ def display_analysis_results(analysis):
     st.markdown("### 🎯 AI Confidence Score")
     confidence_pct = int(analysis['confidence_score'] * 100)
 
-    fig = create_confidence_meter(confidence_pct)
-    st.plotly_chart(fig, use_container_width=True)
+    with track("render_confidence_meter"):
+        fig = create_confidence_meter(confidence_pct)
+        st.plotly_chart(fig, use_container_width=True)
 
     if confidence_pct >= 90:
         st.success(f"✅ High Confidence ({confidence_pct}%) - AI is very certain about this analysis")
@@ -496,50 +561,42 @@ def display_analysis_results(analysis):
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        if st.button("📄 Export PDF"):
-            st.success("PDF exported successfully!")
+        queue = get_job_queue()
+        pdf_job = queue.get(st.session_state.pdf_job_id)
+        if pdf_job is None:
+            if st.button("📄 Export PDF"):
+                # Rendered on the job queue so the script thread stays free
+                st.session_state.pdf_job_id = queue.submit(lambda job: DataExporter.generate_pdf_report(analysis))
+                pdf_export_progress()
+        elif not pdf_job.done:
+            pdf_export_progress()
+        elif pdf_job.status == DONE:
+            st.download_button(
+                "📄 Download PDF",
+                data=pdf_job.result,
+                file_name=f"legalai-{analysis['document_type']}-report.pdf",
+                mime="application/pdf"
+            )
+        else:
+            st.error(f"❌ PDF export failed: {pdf_job.error}")
+            st.session_state.pdf_job_id = None
 
     with col2:
         if st.button("📧 Email Summary"):
             st.success("Summary emailed!")
 
     with col3:
-        if st.button("💾 Save Analysis"):
-            st.success("Analysis saved!")
+        st.download_button(
+            "💾 Save Analysis",
+            data=DataExporter.export_to_json(analysis),
+            file_name=f"legalai-{analysis['document_type']}-analysis.json",
+            mime="application/json"
+        )
 
 def create_confidence_meter(confidence_pct):
     """Create confidence meter visualization"""
-
-    # Create gauge chart
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = confidence_pct,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': "AI Confidence Level"},
-        delta = {'reference': 80},
-        gauge = {
-            'axis': {'range': [None, 100]},
-            'bar': {'color': "#2563EB"},
-            'steps': [
-                {'range': [0, 50], 'color': "#FEE2E2"},
-                {'range': [50, 80], 'color': "#FEF3C7"},
-                {'range': [80, 100], 'color': "#DCFCE7"}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': 90
-            }
-        }
-    ))
-
-    fig.update_layout(
-        height=300,
-        font={'color': "#374151", 'family': "Arial"},
-        margin=dict(l=20, r=20, t=40, b=20)
-    )
-
-    return fig
+    theme = getattr(getattr(st.context, "theme", None), "type", None) or "light"
+    return load_figure(confidence_gauge_json(confidence_pct, theme))
 
 def voice_interface_tab():
     """Voice interface demonstration"""
@@ -603,6 +660,13 @@ def voice_interface_tab():
             </div>
             """, unsafe_allow_html=True)
 
+            # Clauses the answer is based on
+            if response.get("relevant_clauses"):
+                st.markdown("### 📚 Relevant Clauses")
+                for clause in response["relevant_clauses"]:
+                    st.markdown(f"**{clause['citation']}** (Confidence: {clause['confidence']}%)")
+                    st.caption(clause["excerpt"])
+
             # Audio simulation
             st.markdown("### 🔊 Audio Response")
             st.info("🎵 Audio response would play here (Text-to-Speech)")
@@ -634,39 +698,48 @@ def voice_interface_tab():
             """, unsafe_allow_html=True)
 
 def generate_voice_response(question):
-    """Generate AI response to voice question"""
+    """Generate AI response to voice question, grounded in the analyzed document"""
 
     question_lower = question.lower()
 
     # Simple response generation based on keywords
     if "risk" in question_lower or "worry" in question_lower:
-        return {
+        response = {
             "text": "Based on my analysis with 89% confidence, the main risks are: 1) The confidentiality definition is quite broad, 2) The 2-year term is longer than average, and 3) There are limited exceptions for disclosure. However, these are manageable risks for a standard business relationship.",
             "confidence": 89
         }
     elif "breach" in question_lower or "break" in question_lower:
-        return {
+        response = {
             "text": "If you breach the confidentiality clause, the company could seek legal remedies including financial damages and court orders to stop further disclosure. However, with 85% confidence, I note that the agreement lacks specific penalty amounts, which actually limits their ability to claim excessive damages.",
             "confidence": 85
         }
     elif "negotiate" in question_lower:
-        return {
+        response = {
             "text": "Yes, with 92% confidence, these terms are negotiable. I recommend: 1) Reducing the term from 2 years to 1 year, 2) Narrowing the confidentiality definition, and 3) Adding mutual confidentiality if you're also sharing information. Most companies expect some negotiation on NDAs.",
             "confidence": 92
         }
     elif "fair" in question_lower:
-        return {
+        response = {
             "text": "With 88% confidence, these terms are within normal ranges but favor the company. The 2-year term is on the longer side, and the broad confidentiality definition gives them significant protection. However, it's not unusually harsh compared to standard industry NDAs.",
             "confidence": 88
         }
     else:
-        return {
+        response = {
             "text": "I can help explain specific clauses, assess risks, or suggest negotiation points. With 91% confidence, I recommend focusing on the confidentiality definition, term length, and your obligations for returning materials. Would you like me to explain any of these areas in more detail?",
             "confidence": 91
         }
 
+    # Pull the clauses relevant to this question from the loaded document
+    index = st.session_state.get("retrieval_index")
+    if index is not None:
+        response["relevant_clauses"] = VoiceInterface.find_relevant_clauses(index, question)
+        response["text"] = VoiceInterface.cite_clauses(response["text"], response["relevant_clauses"])
+
+    return response
+
 def features_demo_tab():
     """Demonstrate key features and capabilities"""
+    pd = lazy_import("pandas")
 
     st.header("🚀 Feature Demonstrations")
 
@@ -837,6 +910,7 @@ def features_demo_tab():
 
 def business_case_tab():
     """Business case and market opportunity"""
+    pd = lazy_import("pandas")
 
     st.header("🏢 Business Case & Market Opportunity")
 
@@ -847,20 +921,7 @@ def business_case_tab():
 
     with col1:
         # Market size chart
-        market_data = {
-            "Market Segment": ["Legal AI Market", "Document Automation", "Legal Consultation", "Small Business Legal"],
-            "Market Size ($B)": [6.4, 2.1, 15.3, 8.7],
-            "Growth Rate (%)": [31.3, 28.5, 12.4, 18.9]
-        }
-
-        df_market = pd.DataFrame(market_data)
-
-        fig = px.bar(df_market, x="Market Segment", y="Market Size ($B)", 
-                    title="Legal Technology Market Size",
-                    color="Growth Rate (%)",
-                    color_continuous_scale="Blues")
-        fig.update_layout(height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(load_figure(static_chart_json("market_size")), use_container_width=True)
 
     with col2:
         # Key metrics
@@ -885,27 +946,7 @@ def business_case_tab():
     # Revenue projections
     st.markdown("### 📊 Revenue Projections")
 
-    years = [2024, 2025, 2026, 2027]
-    revenue = [100, 1000, 5000, 15000]  # in thousands
-    users = [1, 10, 50, 150]  # in thousands
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Bar(x=years, y=revenue, name="Revenue ($K)", marker_color="#2563EB"),
-        secondary_y=False,
-    )
-
-    fig.add_trace(
-        go.Scatter(x=years, y=users, name="Users (K)", marker_color="#10B981"),
-        secondary_y=True,
-    )
-
-    fig.update_xaxes(title_text="Year")
-    fig.update_yaxes(title_text="Revenue ($K)", secondary_y=False)
-    fig.update_yaxes(title_text="Users (K)", secondary_y=True)
-
-    fig.update_layout(title="Revenue & User Growth Projection", height=400)
+    fig = load_figure(static_chart_json("revenue_projection"))
 
     st.plotly_chart(fig, use_container_width=True)
 
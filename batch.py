@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Headless batch analysis for LegalAI Simplifier
+
+Usage:
+    python batch.py contracts/ --output results.jsonl
+    python batch.py documents.jsonl --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
+
+from chunking import ChunkedAnalyzer
+from config import AI_CONFIG
+from engine import LegalAIEngine
+from utils import DataExporter, DocumentProcessor, RiskAssessor
+
+# Files picked up when the input is a directory
+TEXT_EXTENSIONS = (".txt", ".md")
+PDF_EXTENSIONS = (".pdf",)
+
+# JSONL field names tried in order when not given explicitly
+ID_FIELDS = ("id", "request_id", "name")
+TEXT_FIELDS = ("text", "body", "content")
+
+_engine: Optional[LegalAIEngine] = None
+_chunked: Optional[ChunkedAnalyzer] = None
+
+
+@dataclass
+class BatchReport:
+    """Throughput and latency summary for a batch run"""
+    documents: int = 0
+    errors: int = 0
+    wall_time: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """Documents analyzed per second of wall time"""
+        return self.documents / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> Dict:
+        """Report as a plain dict, latencies in milliseconds"""
+        latencies_ms = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "documents": self.documents,
+            "errors": self.errors,
+            "wall_time_s": round(self.wall_time, 3),
+            "throughput_docs_per_s": round(self.throughput, 2),
+            "latency_ms": {
+                "mean": round(float(latencies_ms.mean()), 2),
+                "p50": round(float(np.percentile(latencies_ms, 50)), 2),
+                "p95": round(float(np.percentile(latencies_ms, 95)), 2),
+                "p99": round(float(np.percentile(latencies_ms, 99)), 2),
+                "max": round(float(latencies_ms.max()), 2)
+            }
+        }
+
+
+def _pick_field(record: Dict, preferred: Optional[str], candidates: Tuple[str, ...]) -> Optional[str]:
+    """Return the first usable field name of a JSONL record"""
+    if preferred:
+        return preferred if preferred in record else None
+    return next((name for name in candidates if name in record), None)
+
+
+class DocumentError(ValueError):
+    """A document that could not be read, reported in its own output record"""
+
+    def __init__(self, document_id: Optional[str], message: str):
+        super().__init__(message)
+        self.document_id = document_id
+
+
+def _read_file(path: str) -> str:
+    """Text of one document file, within the chunked analysis size limit"""
+    max_chars = AI_CONFIG["max_chunked_length"]
+    if path.lower().endswith(PDF_EXTENSIONS):
+        with open(path, "rb") as handle:
+            return DocumentProcessor.extract_text_from_pdf(handle, max_chars)
+    with open(path, "rb") as handle:
+        return DocumentProcessor.extract_text_from_txt(handle, max_chars)
+
+
+def _parse_line(line: str, id_field: Optional[str], text_field: Optional[str]) -> Tuple[Optional[str], str]:
+    """Document id (None if absent) and text of one JSONL record"""
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("record is not a JSON object")
+    id_key = _pick_field(record, id_field, ID_FIELDS)
+    document_id = str(record[id_key]) if id_key else None
+    text_key = _pick_field(record, text_field, TEXT_FIELDS)
+    if text_key is None or not isinstance(record[text_key], str):
+        raise DocumentError(document_id, "no document text field")
+    if len(record[text_key]) > AI_CONFIG["max_chunked_length"]:
+        raise DocumentError(document_id, f"document exceeds {AI_CONFIG['max_chunked_length']:,} characters")
+    return document_id, record[text_key]
+
+
+def iter_documents(source: str, id_field: Optional[str] = None,
+                   text_field: Optional[str] = None) -> Iterator[Tuple[str, Union[str, Exception]]]:
+    """Yield (document_id, text) pairs from a directory or a JSONL file
+
+    A document that cannot be read yields the exception in place of its
+    text, so one bad file or line does not stop the batch.
+    """
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                if name.lower().endswith(TEXT_EXTENSIONS + PDF_EXTENSIONS):
+                    try:
+                        text = _read_file(path)
+                    except Exception as e:
+                        text = e
+                    yield os.path.relpath(path, source), text
+        return
+
+    with open(source, encoding="utf-8", errors="replace") as handle:
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                document_id, text = _parse_line(line, id_field, text_field)
+            except DocumentError as e:
+                document_id, text = e.document_id, e
+            except ValueError as e:
+                document_id, text = None, e
+            yield document_id or f"line-{line_number}", text
+
+
+def _init_worker():
+    """Create one engine per worker process"""
+    global _engine, _chunked
+    _engine = LegalAIEngine()
+    # The batch pool already keeps every core busy, so a long document's
+    # chunks are scanned inside its own worker rather than on a nested pool
+    _chunked = ChunkedAnalyzer(_engine, workers=1)
+
+
+def error_record(document_id: str, error: Exception) -> Dict:
+    """Output record for a document that could not be read or analyzed"""
+    return {"id": document_id, "error": f"{type(error).__name__}: {error}"}
+
+
+def analyze_one(document_id: str, text: str) -> Dict:
+    """Analyze a single document; errors are reported in the record"""
+    engine = _engine or LegalAIEngine()
+    start = time.perf_counter()
+    record = {"id": document_id}
+
+    try:
+        if len(text) > AI_CONFIG["max_document_length"]:
+            chunked = _chunked or ChunkedAnalyzer(engine, workers=1)
+            doc_type, class_confidence, precomputed = chunked.classify(text)
+        else:
+            (doc_type, class_confidence), precomputed = engine.classify_document(text), None
+        record["classification_confidence"] = class_confidence
+        record["analysis"] = engine.analyze_document(text, doc_type, precomputed=precomputed)
+        record["risk_factors"] = RiskAssessor.assess_document_risk(text, doc_type)
+    except Exception as e:
+        record = error_record(document_id, e)
+
+    record["latency_s"] = time.perf_counter() - start
+    return record
+
+
+def analyze_documents(documents: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                      max_in_flight: Optional[int] = None) -> Iterator[Dict]:
+    """Analyze documents on a process pool, yielding records as they finish"""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    documents = iter(documents)
+    running = set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        while True:
+            # Keep a bounded window of submitted work so huge archives
+            # never have to be held in memory at once
+            for document_id, text in documents:
+                if isinstance(text, Exception):
+                    yield error_record(document_id, text)
+                    continue
+                running.add(executor.submit(analyze_one, document_id, text))
+                if len(running) >= max_in_flight:
+                    break
+
+            if not running:
+                break
+
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+
+def run_batch(source: str, output: TextIO, workers: Optional[int] = None,
+              id_field: Optional[str] = None, text_field: Optional[str] = None) -> BatchReport:
+    """Analyze every document in source and stream JSONL records to output"""
+    report = BatchReport()
+    start = time.perf_counter()
+
+    for record in analyze_documents(iter_documents(source, id_field, text_field), workers):
+        output.write(DataExporter.export_to_json(record, indent=None) + "\n")
+        report.documents += 1
+        report.errors += "error" in record
+        if "latency_s" in record:
+            report.latencies.append(record["latency_s"])
+
+    report.wall_time = time.perf_counter() - start
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze many legal documents without the Streamlit UI")
+    parser.add_argument("source", help="directory of .txt/.md/.pdf files or a JSONL file of documents")
+    parser.add_argument("-o", "--output", help="JSONL file to write, gzip/zstd compressed for .gz/.zst (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--id-field", help="JSONL field holding the document id")
+    parser.add_argument("--text-field", help="JSONL field holding the document text")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        with DataExporter.open_export(args.output) as output:
+            report = run_batch(args.source, output, args.workers, args.id_field, args.text_field)
+    else:
+        report = run_batch(args.source, sys.stdout, args.workers, args.id_field, args.text_field)
+
+    print(json.dumps(report.summary(), indent=2), file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for LegalAI Simplifier
+
+Times the analysis hot paths over synthetic contracts (see corpus.py) from 1 KB to 10 MB and
+reports throughput with p50/p99 latency. Results can be saved as a JSON
+baseline and compared against on a later commit.
+
+Usage:
+    python bench.py --output benchmarks/baseline.json
+    python bench.py --sizes 1k,100k --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from corpus import CORPUS_VERSION, SIZE_UNITS, generate_document, parse_size
+from engine import LegalAIEngine
+from retrieval import RetrievalIndex
+from utils import ConfidenceCalculator, DataExporter, DocumentProcessor, RiskAssessor, VoiceInterface
+
+DEFAULT_SIZES = ("1k", "10k", "100k", "1m", "10m")
+
+# Latency growth over the baseline p50 reported as a regression
+DEFAULT_THRESHOLD = 0.2
+
+VOICE_QUESTION = "Can I terminate early and what happens to the security deposit?"
+
+
+class Case:
+    """One benchmarked call, prepared once per document"""
+
+    def __init__(self, name: str, prepare: Callable[[str], Callable[[], object]]):
+        self.name = name
+        self.prepare = prepare
+
+
+def _engine_cases() -> List[Case]:
+    """Benchmarked hot paths"""
+    engine = LegalAIEngine()
+
+    def analysis(text: str) -> Dict:
+        return engine.analyze_document(text, engine.classify_document(text)[0])
+
+    def confidence(text: str):
+        contexts = text.split("\n\n")
+        word_counts = [len(context.split()) for context in contexts]
+        clause_types = ["confidentiality", "termination", "payment", "liability"] * (len(contexts) // 4 + 1)
+        return lambda: ConfidenceCalculator.calculate_clause_confidence_batch(clause_types[:len(contexts)], word_counts)
+
+    def voice(text: str):
+        index = RetrievalIndex(text)
+        return lambda: VoiceInterface.process_voice_question(VOICE_QUESTION, index)
+
+    def export(text: str):
+        result = analysis(text)
+        return lambda: DataExporter.export_to_json(result)
+
+    return [
+        Case("classify_document_type", lambda text: lambda: DocumentProcessor.classify_document_type(text)),
+        Case("assess_document_risk", lambda text: lambda: RiskAssessor.assess_document_risk(text, "lease")),
+        Case("calculate_base_confidence", lambda text: lambda: ConfidenceCalculator.calculate_base_confidence(
+            len(text), text.count("rent"), "Lease Agreement")),
+        Case("calculate_clause_confidence_batch", confidence),
+        Case("analyze_document", lambda text: lambda: analysis(text)),
+        Case("build_retrieval_index", lambda text: lambda: RetrievalIndex(text)),
+        Case("process_voice_question", voice),
+        Case("export_to_json", export)
+    ]
+
+
+def time_call(call: Callable[[], object], min_time: float, min_runs: int, max_runs: int) -> np.ndarray:
+    """Latencies in seconds of repeated calls, after one warm-up call"""
+    call()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < max_runs and (len(latencies) < min_runs or time.perf_counter() - started < min_time):
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def summarize(latencies: np.ndarray, size: int) -> Dict:
+    """Throughput and latency percentiles for one case and size"""
+    latencies_ms = latencies * 1000
+    mean = float(latencies.mean())
+    return {
+        "runs": int(len(latencies)),
+        "mean_ms": round(float(latencies_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 4),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 4),
+        "ops_per_s": round(1 / mean, 2) if mean else 0.0,
+        "mb_per_s": round(size / mean / SIZE_UNITS["m"], 3) if mean else 0.0
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit hash, if running inside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(sizes: Tuple[str, ...] = DEFAULT_SIZES, cases: Optional[List[str]] = None,
+                   min_time: float = 0.5, min_runs: int = 5, max_runs: int = 1000,
+                   doc_type: str = "lease", seed: int = 0) -> Dict:
+    """Benchmark every case at every size on seeded synthetic contracts"""
+    selected = [case for case in _engine_cases() if not cases or case.name in cases]
+    results: Dict[str, Dict[str, Dict]] = {case.name: {} for case in selected}
+
+    for size_label in sizes:
+        size = parse_size(size_label)
+        text = generate_document(doc_type, size, seed=seed)
+        for case in selected:
+            call = case.prepare(text)
+            results[case.name][size_label] = summarize(time_call(call, min_time, min_runs, max_runs), size)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "corpus": {"version": CORPUS_VERSION, "doc_type": doc_type, "seed": seed}
+        },
+        "results": results
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Cases whose p50 latency grew by more than threshold over the baseline
+
+    Raises ValueError when the baseline was recorded on different documents.
+    """
+    recorded = baseline.get("meta", {}).get("corpus")
+    if recorded != current["meta"]["corpus"]:
+        raise ValueError(f"Baseline corpus {recorded} differs from {current['meta']['corpus']}; "
+                         "record a new baseline with --output")
+
+    regressions = []
+    for case, sizes in current["results"].items():
+        for size, stats in sizes.items():
+            before = baseline.get("results", {}).get(case, {}).get(size)
+            if not before or not before["p50_ms"]:
+                continue
+            change = stats["p50_ms"] / before["p50_ms"] - 1
+            if change > threshold:
+                regressions.append({
+                    "case": case, "size": size, "baseline_p50_ms": before["p50_ms"],
+                    "p50_ms": stats["p50_ms"], "change": round(change, 3)
+                })
+    return regressions
+
+
+def format_table(report: Dict) -> str:
+    """Human readable results table"""
+    lines = [f"{'case':<36} {'size':>6} {'runs':>6} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'MB/s':>9}"]
+    for case, sizes in report["results"].items():
+        for size, stats in sizes.items():
+            lines.append(
+                f"{case:<36} {size:>6} {stats['runs']:>6} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+                f"{stats['ops_per_s']:>10.1f} {stats['mb_per_s']:>9.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the LegalAI Simplifier analysis hot paths")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="comma-separated document sizes")
+    parser.add_argument("--cases", help="comma-separated case names (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to spend per case and size")
+    parser.add_argument("--output", help="write results to this JSON baseline file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="p50 slowdown counted as a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(
+        tuple(size for size in args.sizes.split(",") if size),
+        args.cases.split(",") if args.cases else None,
+        min_time=args.min_time
+    )
+    print(format_table(report))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        try:
+            regressions = compare(report, baseline, args.threshold)
+        except ValueError as e:
+            print(f"Cannot compare: {e}", file=sys.stderr)
+            return 2
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} @ {regression['size']}: "
+                  f"{regression['baseline_p50_ms']}ms -> {regression['p50_ms']}ms "
+                  f"(+{regression['change']:.0%})", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Content-addressed analysis result cache for LegalAI Simplifier
+"""
+
+import copy
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import CACHE_CONFIG, SECURITY_CONFIG
+from metrics import record_cache
+from storage import StorageBackend
+
+# Fields that quote the document verbatim and so count as raw text
+EXCERPT_FIELDS = ("content",)
+
+# A clause citation such as "Section 3: <heading> (Page 2)", whose heading is
+# copied from the document (see ClauseIndex.citation)
+CITATION_PATTERN = re.compile(r"(Section [\d.]+|Preamble): .* \((Page \d+)\)$")
+
+
+def make_cache_key(text: str, settings: Optional[Dict] = None) -> str:
+    """Hash the exact text together with the settings that shape the analysis
+
+    Clause offsets, pages and citations depend on every character, including
+    line and page breaks, so the text is not normalized.
+    """
+    settings = settings or {}
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass"))
+    for name in ("jurisdiction", "complexity_level", "document_type"):
+        digest.update(f"\x00{name}={settings.get(name, '')}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def strip_excerpts(value: Any) -> Any:
+    """Return a copy of value with verbatim document text removed
+
+    Excerpts are dropped, and clause headings, which are the document's own
+    words, give way to section and page references such as "Section 3".
+    """
+    if isinstance(value, dict):
+        stripped = {key: strip_excerpts(item) for key, item in value.items() if key not in EXCERPT_FIELDS}
+        if stripped.get("section") and "name" in stripped:
+            stripped["name"] = f"Section {stripped['section']}"
+        return stripped
+    if isinstance(value, list):
+        return [strip_excerpts(item) for item in value]
+    if isinstance(value, str):
+        return CITATION_PATTERN.sub(r"\1 (\2)", value)
+    return value
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-like value in bytes"""
+    return len(json.dumps(value, default=str))
+
+
+class AnalysisCache:
+    """Thread-safe LRU/TTL cache of derived analysis results
+
+    With a storage backend, results are also written through to it and
+    memory misses are looked up there, so processes sharing the backend
+    reuse each other's analyses.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_memory_mb: Optional[float] = None,
+                 ttl_seconds: Optional[float] = None, store_excerpts: Optional[bool] = None,
+                 storage: Optional[StorageBackend] = None):
+        self.max_entries = max_entries or CACHE_CONFIG["max_entries"]
+        self.max_bytes = int((max_memory_mb or CACHE_CONFIG["max_memory_mb"]) * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else CACHE_CONFIG["ttl_seconds"]
+
+        # Excerpts are raw document text, so they may only be cached when the
+        # retention policy allows documents to be kept, and no longer than that
+        retention_minutes = SECURITY_CONFIG["document_retention_time"]
+        self.store_excerpts = retention_minutes > 0 if store_excerpts is None else store_excerpts
+        if self.store_excerpts and retention_minutes > 0:
+            self.ttl_seconds = min(self.ttl_seconds, retention_minutes * 60)
+
+        self.storage = storage
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache("analysis", hit=True)
+                return copy.deepcopy(entry[0])
+
+        value = self.storage.get("analysis", key) if self.storage is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        record_cache("analysis", hit=value is not None)
+        if value is not None:
+            self._store(key, copy.deepcopy(value))
+        return value
+
+    def put(self, key: str, value: Any):
+        """Store a derived result, evicting least recently used entries as needed"""
+        if not self.store_excerpts:
+            value = strip_excerpts(value)
+        else:
+            value = copy.deepcopy(value)
+
+        if self.storage is not None:
+            self.storage.put("analysis", key, value, ttl_seconds=self.ttl_seconds)
+        self._store(key, value)
+
+    def _store(self, key: str, value: Any):
+        """Keep a private copy in memory"""
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+            self.current_bytes += size
+
+            while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_compute(self, text: str, settings: Optional[Dict], compute: Callable[[], Any]) -> Any:
+        """Look up the analysis of text, computing and caching it on a miss
+
+        A fresh result is returned in the same shape as a cached one, so it
+        has no excerpts unless they may be stored.
+        """
+        key = make_cache_key(text, settings)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+            if not self.store_excerpts:
+                value = strip_excerpts(value)
+        return value
+
+    def _remove(self, key: str):
+        """Drop an entry; caller must hold the lock"""
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self.current_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,157 @@
+"""
+Chunked keyword scanning of long documents for LegalAI Simplifier
+
+Keyword scanning is the one analysis step that reads every character, so
+for documents beyond AI_CONFIG["max_document_length"] only that scan is
+split into clause-aligned chunks scanned in parallel on a process pool. A
+clause too long for one chunk is cut into overlapping pieces so keywords
+across a cut are still found. Matches are mapped back to document offsets
+and every other stage runs once, sequentially, over the whole text, so the
+result has the same shape, offsets, pages and citations as a single-pass
+analyze_document.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from config import AI_CONFIG
+from engine import LegalAIEngine
+from matcher import KeywordMatch, get_legal_matcher
+from segmenter import ClauseIndex, segment_document
+
+
+class Piece(NamedTuple):
+    """A span of the document scanned as one unit
+
+    Matches ending at or before owned_start lie entirely in the overlap with
+    the previous piece of the same clause, which already reported them.
+    """
+    span: int  # index of the clause span this piece belongs to
+    start: int
+    owned_start: int
+    end: int
+
+
+def _cut(text: str, start: int, limit: int) -> int:
+    """End of a piece starting at start, preferring a line or sentence end"""
+    window = text[start:limit]
+    for separator in ("\n", ". "):
+        cut = window.rfind(separator, len(window) // 2)
+        if cut >= 0:
+            return start + cut + len(separator)
+    return limit
+
+
+def plan_pieces(text: str, spans: Sequence[Tuple[int, int]], chunk_chars: int, overlap: int) -> List[Piece]:
+    """Pieces covering every span, none longer than chunk_chars plus overlap"""
+    pieces = []
+    for index, (start, end) in enumerate(spans):
+        owned_start = start
+        while owned_start < end:
+            piece_end = end if end - owned_start <= chunk_chars else _cut(text, owned_start, owned_start + chunk_chars)
+            pieces.append(Piece(index, max(start, owned_start - overlap), owned_start, piece_end))
+            owned_start = piece_end
+    return pieces
+
+
+def plan_chunks(pieces: List[Piece], chunk_chars: int) -> List[List[Piece]]:
+    """Group consecutive pieces into chunks of about chunk_chars each"""
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        length = piece.end - piece.start
+        if current and size + length > chunk_chars:
+            chunks.append(current)
+            current, size = [], 0
+        current.append(piece)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def scan_texts(texts: List[str]) -> List[List[KeywordMatch]]:
+    """Keyword matches of each text; runs in a worker process"""
+    matcher = get_legal_matcher()
+    return [matcher.find_all(text) for text in texts]
+
+
+class ChunkedAnalyzer:
+    """Scans long documents in parallel, then analyzes the merged matches in one pass"""
+
+    def __init__(self, engine: Optional[LegalAIEngine] = None, workers: Optional[int] = None,
+                 chunk_chars: Optional[int] = None, overlap: Optional[int] = None):
+        self.engine = engine or LegalAIEngine()
+        self.workers = workers or AI_CONFIG["chunk_workers"] or os.cpu_count() or 1
+        self.chunk_chars = chunk_chars or AI_CONFIG["chunk_chars"]
+        self.overlap = AI_CONFIG["chunk_overlap"] if overlap is None else overlap
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Worker pool reused across documents"""
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs threads (Streamlit, the API
+                # pool) can copy held locks into the child, so use spawn
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def scan_spans(self, text: str, spans: Sequence[Tuple[int, int]]) -> List[Tuple[KeywordMatch, ...]]:
+        """Matches inside each (start, end) span at document offsets"""
+        pieces = plan_pieces(text, spans, self.chunk_chars, self.overlap)
+        chunks = plan_chunks(pieces, self.chunk_chars)
+        batches = [[text[piece.start:piece.end] for piece in chunk] for chunk in chunks]
+
+        if len(batches) <= 1 or self.workers == 1:
+            results = map(scan_texts, batches)
+        else:
+            results = self.executor.map(scan_texts, batches)
+
+        found: List[List[KeywordMatch]] = [[] for _ in spans]
+        for chunk, chunk_matches in zip(chunks, results):
+            for piece, matches in zip(chunk, chunk_matches):
+                shift = piece.start
+                found[piece.span].extend(
+                    KeywordMatch(match.start + shift, match.end + shift, match.term, match.labels)
+                    for match in matches if match.end + shift > piece.owned_start
+                )
+        return [tuple(matches) for matches in found]
+
+    def scan(self, text: str, clause_index: ClauseIndex) -> List[KeywordMatch]:
+        """Every keyword match in the document, in document order"""
+        spans = list(zip(clause_index.starts.tolist(), clause_index.ends.tolist()))
+        return [match for matches in self.scan_spans(text, spans) for match in matches]
+
+    def classify(self, text: str) -> Tuple[str, float, Dict[str, Any]]:
+        """Document type, its probability and the precomputed stage outputs"""
+        clause_index = segment_document(text)
+        matches = self.scan(text, clause_index)
+        doc_type, probability = self.engine.classify_matches(text, matches)
+        return doc_type, probability, {"clause_index": clause_index, "keyword_matches": matches}
+
+    def classify_and_analyze(self, text: str, on_stage: Optional[Callable[[str, Any], None]] = None,
+                             cancel_event: Optional[threading.Event] = None,
+                             doc_type: Optional[str] = None) -> Tuple[str, Dict]:
+        """Document type and full analysis of a document of any length
+
+        doc_type overrides the classified type when the caller already knows it.
+        """
+        classified_type, _, precomputed = self.classify(text)
+        doc_type = doc_type or classified_type
+        if on_stage is not None:
+            on_stage("document_type", doc_type)
+
+        analysis = self.engine.analyze_document(text, doc_type, on_stage, cancel_event, precomputed=precomputed)
+        return doc_type, analysis
+
+    def shutdown(self):
+        """Release the worker pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -0,0 +1,156 @@
+"""
+Document type classifier for LegalAI Simplifier
+
+Every document type in config.DOCUMENT_TYPES contributes weighted terms: its
+keywords, its own name, and the clauses and risk factors expected in it
+(together with those in the engine's legal knowledge base). The weights form
+one term x type matrix built once, so a document's term counts are scored
+against all types with a single sparse product, and a softmax over the
+scores, with a fixed score for a general contract, turns them into
+probabilities for every type. Terms are matched as whole words so, for
+example, "standard" no longer counts as "nda".
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import CLASSIFIER_CONFIG, DOCUMENT_TYPES
+from matcher import KeywordMatch, get_legal_matcher
+
+# Label of classifier terms in the shared keyword matcher
+CLASSIFIER_LABEL = ("classifier", "term")
+
+# Type reported when no specific type is likely
+GENERAL_TYPE = "contract"
+GENERAL_TYPE_NAME = "General Contract"
+
+
+def _phrase(name: str) -> str:
+    """Matchable phrase for a config identifier such as "security_deposit" """
+    return name.replace("_", " ").lower()
+
+
+def _is_word(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is a whole word, allowing a plural "s" """
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end] in "sS":
+        end += 1
+    return end >= len(text) or not text[end].isalnum()
+
+
+class DocumentClassifier:
+    """Scores documents against every type at once with a term weight matrix"""
+
+    def __init__(self, document_types: Dict[str, Dict], knowledge_base: Optional[Dict[str, Dict]] = None,
+                 config: Optional[Dict] = None):
+        config = {**CLASSIFIER_CONFIG, **(config or {})}
+        knowledge_base = knowledge_base or {}
+        self.types = list(document_types) + [GENERAL_TYPE]
+        self.names = {doc_type: info.get("name", doc_type) for doc_type, info in document_types.items()}
+        self.names[GENERAL_TYPE] = GENERAL_TYPE_NAME
+
+        # Highest weight each term has for each type
+        term_weights: Dict[str, Dict[str, float]] = {}
+        for doc_type, info in document_types.items():
+            knowledge = knowledge_base.get(doc_type, {})
+            weighted = [(info.get("name", ""), config["name_weight"])]
+            weighted += [(keyword, config["keyword_weight"]) for keyword in info.get("keywords", [])]
+            weighted += [
+                (term, config["clause_weight"])
+                for term in (info.get("common_clauses", []) + info.get("risk_factors", [])
+                             + knowledge.get("common_clauses", []) + knowledge.get("risk_patterns", []))
+            ]
+            for term, weight in weighted:
+                term = _phrase(term)
+                if term:
+                    row = term_weights.setdefault(term, {})
+                    row[doc_type] = max(row.get(doc_type, 0.0), weight)
+
+        # Terms shared by several types say less about which one a document is
+        self.terms = sorted(term_weights)
+        self.term_rows = {term: row for row, term in enumerate(self.terms)}
+        self.weights = np.zeros((len(self.terms), len(self.types)))
+        for term, weights in term_weights.items():
+            rarity = math.log((1 + len(document_types)) / (1 + len(weights))) + 1
+            for doc_type, weight in weights.items():
+                self.weights[self.term_rows[term], self.types.index(doc_type)] = weight * rarity
+
+        self.bias = np.zeros(len(self.types))
+        self.bias[self.types.index(GENERAL_TYPE)] = config["general_score"]
+        self.temperature = config["temperature"]
+
+    def term_counts(self, text: str, matches: Optional[Iterable[KeywordMatch]] = None) -> Dict[int, int]:
+        """Whole-word occurrences of each classifier term, by matrix row
+
+        matches may be keyword matches already found in text by the legal
+        matcher; otherwise text is scanned.
+        """
+        if matches is None:
+            matches = get_legal_matcher().iter_matches(text)
+        counts: Dict[int, int] = {}
+        for match in matches:
+            row = self.term_rows.get(match.term)
+            if row is not None and _is_word(text, match.start, match.end):
+                counts[row] = counts.get(row, 0) + 1
+        return counts
+
+    def score_counts(self, counts: Sequence[Dict[int, int]]) -> np.ndarray:
+        """Probabilities of every type, one row per document's term counts"""
+        documents = np.repeat(np.arange(len(counts)), [len(document) for document in counts])
+        rows = np.fromiter((row for document in counts for row in document), dtype=np.intp, count=len(documents))
+        frequencies = np.fromiter((count for document in counts for count in document.values()),
+                                  dtype=float, count=len(documents))
+
+        # Sparse documents x terms counts times the dense terms x types weights;
+        # repeated terms count sublinearly so one word cannot dominate
+        scores = np.tile(self.bias, (len(counts), 1))
+        np.add.at(scores, documents, (1 + np.log(frequencies))[:, None] * self.weights[rows])
+
+        logits = scores / self.temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def probabilities_batch(self, texts: Iterable[str]) -> np.ndarray:
+        """Probabilities of every type (columns in self.types) for each text"""
+        return self.score_counts([self.term_counts(text) for text in texts])
+
+    def classify_batch(self, texts: Iterable[str]) -> List[Tuple[str, float]]:
+        """Most likely type and its probability for each text"""
+        probabilities = self.probabilities_batch(texts)
+        best = probabilities.argmax(axis=1)
+        return [(self.types[column], float(probabilities[row, column])) for row, column in enumerate(best)]
+
+    def classify_counts(self, counts: Dict[int, int]) -> Tuple[str, float]:
+        """Most likely type and its probability from term_counts() output
+
+        Terms are matched within a line, so the counts of a document's
+        clauses can be summed and scored as the whole document.
+        """
+        probabilities = self.score_counts([counts])[0]
+        column = int(probabilities.argmax())
+        return self.types[column], float(probabilities[column])
+
+    def probabilities(self, text: str, matches: Optional[Iterable[KeywordMatch]] = None) -> Dict[str, float]:
+        """Probability of every document type for one text"""
+        probabilities = self.score_counts([self.term_counts(text, matches)])[0]
+        return dict(zip(self.types, probabilities.tolist()))
+
+    def classify(self, text: str, matches: Optional[Iterable[KeywordMatch]] = None) -> Tuple[str, float]:
+        """Most likely document type and its probability"""
+        probabilities = self.probabilities(text, matches)
+        doc_type = max(probabilities, key=probabilities.get)
+        return doc_type, probabilities[doc_type]
+
+
+@lru_cache(maxsize=1)
+def get_document_classifier() -> DocumentClassifier:
+    """Classifier over the configured document types and the legal knowledge base"""
+    # Imported here because engine classifies through this module
+    from engine import LEGAL_KNOWLEDGE_BASE
+
+    return DocumentClassifier(DOCUMENT_TYPES, LEGAL_KNOWLEDGE_BASE)
@@ -18,10 +18,36 @@ APP_CONFIG = {
 # AI Model Configuration
 AI_CONFIG = {
     "confidence_threshold": 0.7,
-    "max_document_length": 10000,  # characters
+    "max_document_length": 10000,  # characters analyzed in one pass; longer documents are chunked
+    "max_chunked_length": 5_000_000,  # characters accepted at all
+    "chunk_chars": 50_000,  # characters scanned per worker task
+    "chunk_overlap": 200,  # characters re-scanned where an oversized clause is cut
+    "chunk_workers": None,  # None = one process per CPU core
     "supported_formats": [".pdf", ".txt", ".docx", ".doc"],
     "max_file_size": 10,  # MB
     "processing_timeout": 30,  # seconds
+    "pipeline_workers": 4,  # threads per analysis pipeline
+    "job_workers": 2,  # background analyses running at once, shared by all sessions
+    "job_retention": 600,  # seconds a finished job's result stays available
+    "scoring_seed": None,  # None = simulated scores depend on document content alone
+}
+
+# REST API Configuration
+API_CONFIG = {
+    "host": os.getenv("LEGALAI_API_HOST", "127.0.0.1"),
+    "port": int(os.getenv("LEGALAI_API_PORT", "8000")),
+    "workers": 4,  # engine calls running at once
+    "max_pending": 64,  # documents queued or running before requests get 429
+    "max_batch": 32,  # documents per batch request
+    "retry_after": 1  # seconds clients are told to wait after a 429
+}
+
+# OCR Configuration
+OCR_CONFIG = {
+    "language": "eng",
+    "workers": None,  # None = one process per CPU core
+    "cache_pages": 512,
+    "image_formats": [".png", ".jpg", ".jpeg", ".tif", ".tiff"]
 }
 
 # Voice Interface Configuration
@@ -44,6 +70,39 @@ SECURITY_CONFIG = {
     "gdpr_compliant": True
 }
 
+# Analysis Cache Configuration
+CACHE_CONFIG = {
+    "max_entries": 256,
+    "max_memory_mb": 64,
+    "ttl_seconds": 3600,
+    "max_figures": 256  # serialized chart specs kept by figures.FIGURE_CACHE
+}
+
+# Shared Storage Configuration
+STORAGE_CONFIG = {
+    "backend": os.getenv("LEGALAI_STORAGE", "memory"),  # "memory" (per process) or "sqlite" (per host)
+    "sqlite_path": os.getenv("LEGALAI_STORAGE_PATH", "legalai.db"),
+    "pool_size": 4,  # SQLite connections per process
+    "busy_timeout": 5,  # seconds to wait for another process's write lock
+    "memory_max_entries": 10_000,  # values kept by the in-memory backend
+    "purge_interval": 60  # seconds between sweeps of expired in-memory values
+}
+
+# Session History Configuration
+HISTORY_CONFIG = {
+    "capacity": 10,  # analyses kept in memory per session
+    "max_memory_kb": 64,  # per-session budget for history records
+    "spill_dir": os.getenv("LEGALAI_HISTORY_DIR") or None  # None = evicted records are dropped
+}
+
+# Metrics Configuration
+METRICS_CONFIG = {
+    "enabled": os.getenv("LEGALAI_METRICS", "0") == "1",
+    "port": int(os.getenv("LEGALAI_METRICS_PORT", "9464")),
+    "latency_buckets": [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],  # seconds
+    "size_buckets": [1000, 5000, 10000, 50000, 100000, 500000, 1000000, 10000000]  # characters
+}
+
 # UI Configuration
 UI_CONFIG = {
     "theme": {
@@ -111,10 +170,20 @@ JURISDICTION_CONFIG = {
     "default_jurisdiction": "US-CA"
 }
 
+# Document Classifier Configuration
+CLASSIFIER_CONFIG = {
+    "keyword_weight": 3.0,  # a document type's "keywords"
+    "name_weight": 4.0,  # the type's own name, e.g. "lease agreement"
+    "clause_weight": 1.0,  # its expected clauses and risk factors
+    "general_score": 5.0,  # score at which a general contract is as likely as a specific type
+    "temperature": 4.0  # higher values spread probability more evenly across types
+}
+
 # Document Types Configuration
 DOCUMENT_TYPES = {
     "nda": {
         "name": "Non-Disclosure Agreement",
+        "keywords": ["nda", "non-disclosure", "confidential"],
         "common_clauses": [
             "confidentiality_definition", "permitted_disclosures", "term_duration",
             "return_of_materials", "remedies", "governing_law"
@@ -126,6 +195,7 @@ DOCUMENT_TYPES = {
     },
     "lease": {
         "name": "Lease Agreement",
+        "keywords": ["lease", "rent", "tenant", "landlord"],
         "common_clauses": [
             "rent_amount", "security_deposit", "maintenance_responsibilities",
             "pet_policy", "termination_clause", "renewal_options"
@@ -137,6 +207,7 @@ DOCUMENT_TYPES = {
     },
     "employment": {
         "name": "Employment Contract",
+        "keywords": ["employment", "employee", "job", "salary"],
         "common_clauses": [
             "compensation", "benefits", "job_responsibilities", "termination_terms",
             "non_compete", "intellectual_property", "confidentiality"
@@ -153,11 +224,18 @@ def get_config(config_name: str) -> Dict[str, Any]:
     configs = {
         "app": APP_CONFIG,
         "ai": AI_CONFIG,
+        "api": API_CONFIG,
+        "ocr": OCR_CONFIG,
         "voice": VOICE_CONFIG,
         "security": SECURITY_CONFIG,
+        "cache": CACHE_CONFIG,
+        "history": HISTORY_CONFIG,
+        "storage": STORAGE_CONFIG,
+        "metrics": METRICS_CONFIG,
         "ui": UI_CONFIG,
         "business": BUSINESS_CONFIG,
         "jurisdiction": JURISDICTION_CONFIG,
+        "classifier": CLASSIFIER_CONFIG,
         "documents": DOCUMENT_TYPES
     }
     return configs.get(config_name, {})
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Synthetic legal document corpus for LegalAI Simplifier
+
+Builds NDAs, leases and employment contracts of any size from the clause
+vocabularies in config.DOCUMENT_TYPES and the engine's knowledge base, with
+a controllable density of RiskAssessor.RISK_KEYWORDS terms. The same seed
+always produces the same documents.
+
+Usage:
+    python corpus.py --count 1000 --size 10k --output corpus.jsonl
+    python batch.py corpus.jsonl --output results.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config import DOCUMENT_TYPES
+from engine import LEGAL_KNOWLEDGE_BASE
+from utils import PAGE_BREAK, RiskAssessor
+
+# Bump whenever templates or generation change, so stored benchmark
+# baselines recorded on the old documents are no longer compared against
+CORPUS_VERSION = 1
+
+DOC_TYPES = ("nda", "lease", "employment")
+SIZE_UNITS = {"k": 1024, "m": 1024 * 1024}
+
+# The two sides of each agreement
+PARTY_ROLES = {
+    "nda": ("Disclosing Party", "Receiving Party"),
+    "lease": ("Landlord", "Tenant"),
+    "employment": ("Employer", "Employee")
+}
+
+TITLES = {
+    "nda": "NON-DISCLOSURE AGREEMENT",
+    "lease": "RESIDENTIAL LEASE AGREEMENT",
+    "employment": "EMPLOYMENT AGREEMENT"
+}
+
+ORGANIZATIONS = ("Acme Holdings LLC", "Northwind Traders Inc.", "Blue Harbor Properties", "Tech Innovations Inc.",
+                 "Summit Legal Group", "Riverside Management Co.", "Pioneer Analytics Corp.")
+PEOPLE = ("Jane Smith", "John Doe", "Sarah Johnson", "Miguel Alvarez", "Priya Patel", "Chen Wei", "Amara Okafor")
+STATES = ("California", "Texas", "New York", "Florida")
+
+# Sentence templates; {clause} is the clause topic and {a}/{b} the party roles
+SENTENCES = (
+    "The {b} shall comply with all obligations relating to {clause} described in this section.",
+    "Any change to the {clause} terms must be agreed in writing by the {a} and the {b}.",
+    "The {a} may review compliance with the {clause} provisions on request.",
+    "Nothing in this section limits the rights of the {a} under applicable law.",
+    "The {b} acknowledges that the {clause} obligations survive for the period stated in this Agreement.",
+    "Notices concerning {clause} shall be delivered to the addresses listed on the signature page.",
+    "If any part of this section is held unenforceable, the remaining {clause} terms stay in effect.",
+    "The {a} and the {b} shall each bear their own costs in connection with {clause}.",
+    "Failure to enforce any {clause} provision is not a waiver of that provision.",
+    "The {b} shall promptly inform the {a} of any circumstance affecting {clause}."
+)
+
+# Short phrases that carry a risk keyword into a sentence
+RISK_PHRASES = (
+    "This obligation is {term}.",
+    "The {a} acts at its {term} in this respect.",
+    "These terms apply on a {term} basis.",
+    "Disputes under this section are subject to {term}."
+)
+
+# Risk keywords are mostly embedded in sentences this often per clause by default
+DEFAULT_RISK_DENSITY = 1.0
+DEFAULT_RISK_MIX = (0.3, 0.4, 0.3)  # high, medium, low
+
+
+def parse_size(size: str) -> int:
+    """Characters for a size such as '10k' or '1m'"""
+    size = size.strip().lower()
+    if size[-1:] in SIZE_UNITS:
+        return int(float(size[:-1]) * SIZE_UNITS[size[-1]])
+    return int(size)
+
+
+def _title(term: str) -> str:
+    """Heading text for a vocabulary term"""
+    return term.replace("_", " ").upper()
+
+
+def _clause_topics(doc_type: str) -> List[str]:
+    """Clause topics for a document type from both vocabularies"""
+    topics = [term.replace("_", " ") for term in DOCUMENT_TYPES[doc_type]["common_clauses"]]
+    for term in LEGAL_KNOWLEDGE_BASE[doc_type]["common_clauses"]:
+        if term not in topics:
+            topics.append(term)
+    return topics
+
+
+def _risk_sentence(rng: random.Random, roles: Tuple[str, str], doc_type: str,
+                   risk_mix: Sequence[float], pattern_rate: float) -> str:
+    """A sentence containing one risk keyword or known risk pattern"""
+    if rng.random() < pattern_rate:
+        term = rng.choice(LEGAL_KNOWLEDGE_BASE[doc_type]["risk_patterns"])
+    else:
+        level = rng.choices(("high", "medium", "low"), weights=risk_mix)[0]
+        term = rng.choice(RiskAssessor.RISK_KEYWORDS[level])
+    return rng.choice(RISK_PHRASES).format(term=term, a=roles[0])
+
+
+def generate_document(doc_type: str = "lease", size: int = 4096, seed: int = 0,
+                      risk_density: float = DEFAULT_RISK_DENSITY,
+                      risk_mix: Sequence[float] = DEFAULT_RISK_MIX,
+                      pattern_rate: float = 0.1, page_chars: Optional[int] = 3000) -> str:
+    """One synthetic contract of about size characters
+
+    risk_density is the average number of risk keywords per clause,
+    risk_mix weights high/medium/low keywords and pattern_rate is the share
+    of those drawn from the knowledge base's risk patterns instead. A page
+    break is inserted before the first clause after every page_chars.
+    """
+    if doc_type not in PARTY_ROLES:
+        raise ValueError(f"Unknown document type: {doc_type}")
+
+    rng = random.Random(seed)
+    roles = PARTY_ROLES[doc_type]
+    topics = _clause_topics(doc_type)
+    first = rng.choice(ORGANIZATIONS)
+    second = rng.choice(PEOPLE if doc_type != "nda" else ORGANIZATIONS)
+    state = rng.choice(STATES)
+
+    parts = [
+        f"{TITLES[doc_type]}\n\n"
+        f"This Agreement is entered into by {first} (the \"{roles[0]}\") and {second} "
+        f"(the \"{roles[1]}\"), and is governed by the laws of the State of {state}.\n"
+    ]
+    length = len(parts[0])
+    next_page = page_chars or 0
+    number = 0
+
+    while length < size:
+        number += 1
+        topic = topics[(number - 1) % len(topics)]
+        sentences = [
+            rng.choice(SENTENCES).format(clause=topic, a=roles[0], b=roles[1])
+            for _ in range(rng.randint(2, 5))
+        ]
+        # Whole part of the density always, the fractional part with that probability
+        risk_count = int(risk_density) + (rng.random() < risk_density - int(risk_density))
+        for _ in range(risk_count):
+            sentences.insert(rng.randint(0, len(sentences)), _risk_sentence(
+                rng, roles, doc_type, risk_mix, pattern_rate
+            ))
+
+        page_break = ""
+        if page_chars and length >= next_page:
+            page_break = PAGE_BREAK
+            next_page += page_chars
+        clause = f"\n{page_break}{number}. {_title(topic)}\n{' '.join(sentences)}\n"
+        parts.append(clause)
+        length += len(clause)
+
+    text = "".join(parts)
+    if len(text) > size:
+        # Trim to the last full sentence that fits
+        cut = text.rfind(".", 0, size)
+        text = text[:cut + 1] if cut > len(parts[0]) else text[:size]
+    return text
+
+
+def generate_corpus(count: int, size: int = 4096, doc_types: Sequence[str] = DOC_TYPES, seed: int = 0,
+                    **options) -> Iterator[Dict]:
+    """Records of id, document_type and text, cycling through doc_types"""
+    for index in range(count):
+        doc_type = doc_types[index % len(doc_types)]
+        yield {
+            "id": f"{doc_type}-{seed}-{index:06d}",
+            "document_type": doc_type,
+            "text": generate_document(doc_type, size, seed * 1_000_003 + index, **options)
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic legal document corpus")
+    parser.add_argument("--count", type=int, default=100, help="number of documents")
+    parser.add_argument("--size", default="4k", help="characters per document, e.g. 10k or 1m")
+    parser.add_argument("--types", default=",".join(DOC_TYPES), help="comma-separated document types")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--risk-density", type=float, default=DEFAULT_RISK_DENSITY,
+                        help="average risk keywords per clause")
+    parser.add_argument("-o", "--output", help="JSONL file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    records = generate_corpus(args.count, parse_size(args.size), args.types.split(","), args.seed,
+                              risk_density=args.risk_density)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for record in records:
+            output.write(json.dumps(record) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
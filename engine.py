@@ -0,0 +1,278 @@
+"""
+Legal analysis engine for LegalAI Simplifier
+"""
+
+import hashlib
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from classifier import get_document_classifier
+from config import AI_CONFIG
+from matcher import KeywordMatch, get_legal_matcher
+from metrics import observe_document_size, timed
+from pipeline import AnalysisPipeline, Stage
+from segmenter import Clause, ClauseIndex, segment_document
+from utils import PAGE_BREAK
+
+# Longest clause excerpt included in the analysis
+CLAUSE_EXCERPT_LENGTH = 300
+
+# Order of clause risk levels; "" is a clause with no risk keywords
+RISK_RANK = {"": 0, "low": 1, "medium": 2, "high": 3}
+
+# Simulated AI models and databases
+LEGAL_KNOWLEDGE_BASE = {
+    "nda": {
+        "common_clauses": ["confidentiality", "non-disclosure", "return of materials", "term duration", "exceptions"],
+        "risk_patterns": ["perpetual term", "broad definition", "unlimited liability", "no exceptions"],
+        "jurisdiction_data": {"california": "Strong employee protection", "texas": "Employer-friendly", "new_york": "Balanced approach"}
+    },
+    "lease": {
+        "common_clauses": ["rent amount", "security deposit", "maintenance", "termination", "pets"],
+        "risk_patterns": ["no maintenance responsibility", "excessive fees", "automatic renewal", "broad landlord rights"],
+        "jurisdiction_data": {"california": "Strong tenant protection", "texas": "Landlord-friendly", "new_york": "Rent stabilized"}
+    },
+    "employment": {
+        "common_clauses": ["compensation", "benefits", "termination", "non-compete", "intellectual property"],
+        "risk_patterns": ["at-will termination", "broad non-compete", "no severance", "IP assignment"],
+        "jurisdiction_data": {"california": "Non-compete banned", "texas": "At-will state", "new_york": "Restrictive non-compete"}
+    }
+}
+
+class LegalAIEngine:
+    # Range the overall analysis confidence is drawn from
+    ANALYSIS_CONFIDENCE_RANGE = (0.75, 0.98)
+
+    def __init__(self, seed: Optional[int] = None):
+        self.legal_knowledge_base = LEGAL_KNOWLEDGE_BASE
+        # Simulated scores are derived from the document content, so the same
+        # input always gets the same result; a seed selects another fixed draw
+        self.seed = AI_CONFIG["scoring_seed"] if seed is None else seed
+
+        # Analysis stages; each reported stage's name is its key in the analysis result.
+        # The document is segmented and keyword-scanned once, and every later stage
+        # works from those shared results instead of re-reading the full text
+        self.pipeline = AnalysisPipeline([
+            Stage("clause_index", segment_document, ("text",), internal=True),
+            Stage("keyword_matches", self._scan_keywords, ("text",), internal=True),
+            Stage("risk_assessment", self._assess_risks, ("doc_type", "clause_index", "keyword_matches")),
+            Stage("key_clauses", self._extract_clauses, ("text", "doc_type", "clause_index", "keyword_matches")),
+            Stage("plain_language_summary", self._generate_summary, ("text", "doc_type")),
+            Stage("source_citations", self._generate_citations, ("clause_index",)),
+            Stage("recommendations", self._generate_recommendations, ("doc_type",))
+        ], max_workers=AI_CONFIG["pipeline_workers"])
+
+    def _draw(self, low: float, high: float, *content: bytes) -> float:
+        """Value in [low, high) fixed by the content and the engine seed"""
+        digest = hashlib.blake2b(digest_size=8)
+        if self.seed is not None:
+            digest.update(f"seed={self.seed}\x00".encode("utf-8"))
+        for part in content:
+            digest.update(part)
+            digest.update(b"\x00")
+        return low + (high - low) * int.from_bytes(digest.digest(), "big") / 2 ** 64
+
+    @timed("classify_document")
+    def classify_document(self, text: str) -> Tuple[str, float]:
+        """Classify document type with confidence"""
+        return get_document_classifier().classify(text)
+
+    def classify_matches(self, text: str, keyword_matches: Iterable[KeywordMatch]) -> Tuple[str, float]:
+        """Classify from the keyword matches already found in text"""
+        return get_document_classifier().classify(text, keyword_matches)
+
+    @timed("analyze_document")
+    def analyze_document(self, text: str, doc_type: str,
+                         on_stage: Optional[Callable[[str, Any], None]] = None,
+                         cancel_event: Optional[threading.Event] = None,
+                         precomputed: Optional[Dict[str, Any]] = None) -> Dict:
+        """Analyze document and return structured results
+
+        on_stage and cancel_event are passed to the pipeline so callers can
+        report progress and stop a run early (see AnalysisPipeline.run).
+        precomputed supplies stage outputs, such as clause_index and
+        keyword_matches, that the caller already has for this text. Stage
+        timings go to the metrics registry, not the result, so the same
+        text always yields an identical analysis.
+        """
+        observe_document_size(len(text))
+
+        # Generate confidence score
+        base_confidence = self._draw(*self.ANALYSIS_CONFIDENCE_RANGE, doc_type.encode("utf-8"),
+                                     text.encode("utf-8", "surrogatepass"))
+
+        # Run the analysis stages
+        result = self.pipeline.run({"text": text, "doc_type": doc_type, **(precomputed or {})}, on_stage, cancel_event)
+
+        analysis = {
+            "document_type": doc_type,
+            "confidence_score": base_confidence,
+            **result.outputs
+        }
+
+        return analysis
+
+    @staticmethod
+    def _scan_keywords(text: str) -> List[KeywordMatch]:
+        """Find every risk and classification keyword in one pass"""
+        return get_legal_matcher().find_all(text)
+
+    def _assess_risks(self, doc_type: str, clause_index: ClauseIndex,
+                      keyword_matches: List[KeywordMatch]) -> List[Dict]:
+        """Assess risk levels of clauses"""
+        pattern = ("risk_pattern", doc_type)
+        hits = ((match.term, match.start) for match in keyword_matches if pattern in match.labels)
+        return self.assess_pattern_risks(doc_type, clause_index, hits)
+
+    def assess_pattern_risks(self, doc_type: str, clause_index: ClauseIndex,
+                             pattern_hits: Iterable[Tuple[str, int]]) -> List[Dict]:
+        """Risks of a doc_type document with the given risk pattern hits
+
+        pattern_hits are (term, offset) pairs in document order; each term is
+        flagged once, citing the clause where it first occurs.
+        """
+        risks = []
+
+        if doc_type == "nda":
+            risks = [
+                {"clause": "Confidentiality Definition", "risk": "medium", "confidence": 0.87, "explanation": "Definition is somewhat broad but reasonable for standard business use"},
+                {"clause": "Term Duration", "risk": "low", "confidence": 0.94, "explanation": "Standard 2-year term with reasonable exceptions"},
+                {"clause": "Return of Materials", "risk": "low", "confidence": 0.91, "explanation": "Clear obligations for document return upon termination"}
+            ]
+        elif doc_type == "lease":
+            risks = [
+                {"clause": "Security Deposit", "risk": "high", "confidence": 0.82, "explanation": "Deposit amount exceeds local legal limits and lacks clear return conditions"},
+                {"clause": "Maintenance Responsibility", "risk": "medium", "confidence": 0.89, "explanation": "Some maintenance responsibilities shifted to tenant beyond normal wear"},
+                {"clause": "Pet Policy", "risk": "low", "confidence": 0.95, "explanation": "Reasonable pet policy with standard deposit requirements"}
+            ]
+        else:
+            risks = [
+                {"clause": "General Terms", "risk": "medium", "confidence": 0.85, "explanation": "Standard contract terms with some areas requiring attention"}
+            ]
+
+        # Flag known risk patterns for this document type, citing where they occur
+        seen = set()
+        for term, offset in pattern_hits:
+            if term in seen:
+                continue
+            seen.add(term)
+            position = clause_index.find(offset)
+            location = clause_index.citation(position) if position is not None else "the document"
+            risks.append({
+                "clause": term.title(),
+                "risk": "high",
+                "confidence": 0.8,
+                "explanation": f"Known {doc_type.upper()} risk pattern found in {location}"
+            })
+
+        return risks
+
+    @staticmethod
+    def match_risk_level(doc_type: str, match: KeywordMatch) -> str:
+        """Risk level a keyword signals in a doc_type document ("" for none)"""
+        level = ""
+        for label in match.labels:
+            if label == ("risk_pattern", doc_type):
+                return "high"
+            if label[0] == "risk_level" and label[1] != "low" and RISK_RANK[label[1]] > RISK_RANK[level]:
+                level = label[1]
+        return level
+
+    def _clause_risk_levels(self, doc_type: str, clause_index: ClauseIndex,
+                            keyword_matches: List[KeywordMatch]) -> List[str]:
+        """Highest risk keyword level found inside each indexed clause"""
+        levels = [""] * len(clause_index)
+        positions = clause_index.locate([match.start for match in keyword_matches])
+
+        for match, position in zip(keyword_matches, positions):
+            if position < 0:
+                continue
+            level = self.match_risk_level(doc_type, match)
+            if RISK_RANK[level] > RISK_RANK[levels[position]]:
+                levels[position] = level
+        return levels
+
+    def clause_entry(self, doc_type: str, clause: Clause, level: str) -> Dict:
+        """Key clause result for one numbered clause with its risk level"""
+        common_clauses = self.legal_knowledge_base.get(doc_type, {}).get("common_clauses", [])
+        words = [word for word in clause.heading.lower().split() if len(word) > 3]
+        expected = any(word in common for word in words for common in common_clauses)
+        return {
+            "name": clause.heading,
+            "content": clause.text[:CLAUSE_EXCERPT_LENGTH],
+            "importance": level or ("medium" if expected else "low"),
+            "page_reference": f"Page {clause.page}",
+            "section": clause.number,
+            "start": clause.start,
+            "end": clause.end
+        }
+
+    def _extract_clauses(self, text: str, doc_type: str, clause_index: ClauseIndex,
+                         keyword_matches: List[KeywordMatch]) -> List[Dict]:
+        """Extract key clauses from document"""
+        common_clauses = self.legal_knowledge_base.get(doc_type, {}).get("common_clauses", [])
+        levels = self._clause_risk_levels(doc_type, clause_index, keyword_matches)
+        clauses = []
+
+        for position, clause in enumerate(clause_index.iter_clauses(text)):
+            if clause.number:
+                clauses.append(self.clause_entry(doc_type, clause, levels[position]))
+
+        if clauses:
+            return clauses
+
+        # No numbered sections; locate the clauses expected for this document type instead
+        for common in common_clauses:
+            found = re.search(re.escape(common.split()[0]), text, re.IGNORECASE)
+            if not found:
+                continue
+            start = max(text.rfind(".", 0, found.start()), text.rfind("\n", 0, found.start())) + 1
+            end = text.find(".", found.end())
+            end = len(text) if end < 0 else end + 1
+            position = clause_index.find(found.start())
+            clauses.append({
+                "name": common.title(),
+                "content": text[start:end].strip()[:CLAUSE_EXCERPT_LENGTH],
+                "importance": levels[position] if position is not None and levels[position] else "medium",
+                "page_reference": f"Page {text.count(PAGE_BREAK, 0, found.start()) + 1}",
+                "section": "",
+                "start": start,
+                "end": end
+            })
+        return clauses
+
+    def _generate_summary(self, text: str, doc_type: str) -> str:
+        """Generate plain language summary"""
+        summaries = {
+            "nda": "This is a Non-Disclosure Agreement that prevents you from sharing confidential information. Key points: You must keep business information secret for 2 years, return all documents when done, and there are standard exceptions for public information.",
+            "lease": "This is a rental agreement for an apartment or house. Key points: Monthly rent is due on the 1st, security deposit required, tenant responsible for some maintenance, standard termination notice required.",
+            "employment": "This is an employment contract outlining your job terms. Key points: Salary and benefits detailed, at-will employment meaning either party can terminate, some restrictions on working for competitors.",
+            "contract": "This appears to be a general business contract. The document outlines mutual obligations, payment terms, and standard legal protections for both parties."
+        }
+        return summaries.get(doc_type, summaries["contract"])
+
+    def _generate_citations(self, clause_index: ClauseIndex) -> List[str]:
+        """Generate source citations"""
+        return [clause_index.citation(position) for position in range(len(clause_index))]
+
+    def _generate_recommendations(self, doc_type: str) -> List[str]:
+        """Generate actionable recommendations"""
+        recommendations = {
+            "nda": [
+                "Consider negotiating a shorter term (1 year instead of 2)",
+                "Request clarification on what constitutes 'confidential information'",
+                "Ensure mutual confidentiality if you're sharing information too"
+            ],
+            "lease": [
+                "Verify security deposit amount complies with local laws",
+                "Document existing damage before move-in",
+                "Understand your rights regarding maintenance and repairs"
+            ],
+            "employment": [
+                "Review non-compete restrictions carefully",
+                "Understand your benefits eligibility timeline",
+                "Clarify intellectual property ownership policies"
+            ]
+        }
+        return recommendations.get(doc_type, ["Review document with legal counsel if terms seem unfavorable"])
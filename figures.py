@@ -0,0 +1,190 @@
+"""
+Chart building and figure caching for LegalAI Simplifier
+
+Figures are cached as serialized plotly JSON, keyed by chart, value and
+theme. Static charts are built once per process; the confidence gauge is
+serialized once per theme as a template and only its value is patched in.
+Cached specs were produced from validated figures, so load_figure() rebuilds
+them without plotly's (comparatively slow) validation pass.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from config import CACHE_CONFIG, UI_CONFIG
+from metrics import record_cache
+from startup import lazy_import
+
+# Font colours per Streamlit theme type
+THEME_FONT_COLORS = {
+    "light": "#374151",
+    "dark": "#E5E7EB"
+}
+
+# Stands in for the gauge value while the template is serialized
+_VALUE_PLACEHOLDER = "__legalai_gauge_value__"
+
+
+class FigureCache:
+    """Thread-safe LRU cache of serialized figure JSON"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or CACHE_CONFIG["max_figures"]
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], str]) -> str:
+        """Return the cached JSON for key, building and storing it on a miss"""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache("figure", hit=True)
+                return spec
+            self.misses += 1
+        record_cache("figure", hit=False)
+
+        spec = build()
+        with self._lock:
+            self._entries[key] = spec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return spec
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Remove every cached figure"""
+        with self._lock:
+            self._entries.clear()
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def load_figure(spec: str):
+    """Rebuild a plotly Figure from cached JSON without revalidating it"""
+    go = lazy_import("plotly.graph_objects")
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+def build_confidence_gauge(value: float, theme: str = "light"):
+    """Gauge chart of the AI confidence level"""
+    go = lazy_import("plotly.graph_objects")
+
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = value,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "AI Confidence Level"},
+        delta = {'reference': 80},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': UI_CONFIG["theme"]["primary_color"]},
+            'steps': [
+                {'range': [0, 50], 'color': "#FEE2E2"},
+                {'range': [50, 80], 'color': "#FEF3C7"},
+                {'range': [80, 100], 'color': "#DCFCE7"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+
+    fig.update_layout(
+        height=300,
+        font={'color': THEME_FONT_COLORS.get(theme, THEME_FONT_COLORS["light"]), 'family': "Arial"},
+        margin=dict(l=20, r=20, t=40, b=20)
+    )
+
+    return fig
+
+
+def _gauge_template(theme: str) -> Tuple[str, str]:
+    """Serialized gauge split around its value"""
+    def build() -> str:
+        spec = json.loads(build_confidence_gauge(0, theme).to_json())
+        spec["data"][0]["value"] = _VALUE_PLACEHOLDER
+        return json.dumps(spec)
+
+    template = FIGURE_CACHE.get_or_build(("confidence_gauge_template", theme), build)
+    prefix, suffix = template.split(json.dumps(_VALUE_PLACEHOLDER))
+    return prefix, suffix
+
+
+def confidence_gauge_json(value: float, theme: str = "light") -> str:
+    """Serialized confidence gauge for a value, patched into the theme's template"""
+    def build() -> str:
+        prefix, suffix = _gauge_template(theme)
+        return prefix + json.dumps(value) + suffix
+
+    return FIGURE_CACHE.get_or_build(("confidence_gauge", value, theme), build)
+
+
+def build_market_chart():
+    """Bar chart of legal technology market segments"""
+    px = lazy_import("plotly.express")
+
+    market_data = {
+        "Market Segment": ["Legal AI Market", "Document Automation", "Legal Consultation", "Small Business Legal"],
+        "Market Size ($B)": [6.4, 2.1, 15.3, 8.7],
+        "Growth Rate (%)": [31.3, 28.5, 12.4, 18.9]
+    }
+
+    fig = px.bar(market_data, x="Market Segment", y="Market Size ($B)",
+                 title="Legal Technology Market Size",
+                 color="Growth Rate (%)",
+                 color_continuous_scale="Blues")
+    fig.update_layout(height=400)
+    return fig
+
+
+def build_revenue_chart():
+    """Revenue and user growth projection on twin axes"""
+    go = lazy_import("plotly.graph_objects")
+    make_subplots = lazy_import("plotly.subplots").make_subplots
+
+    years = [2024, 2025, 2026, 2027]
+    revenue = [100, 1000, 5000, 15000]  # in thousands
+    users = [1, 10, 50, 150]  # in thousands
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+    fig.add_trace(
+        go.Bar(x=years, y=revenue, name="Revenue ($K)", marker_color="#2563EB"),
+        secondary_y=False,
+    )
+
+    fig.add_trace(
+        go.Scatter(x=years, y=users, name="Users (K)", marker_color="#10B981"),
+        secondary_y=True,
+    )
+
+    fig.update_xaxes(title_text="Year")
+    fig.update_yaxes(title_text="Revenue ($K)", secondary_y=False)
+    fig.update_yaxes(title_text="Users (K)", secondary_y=True)
+
+    fig.update_layout(title="Revenue & User Growth Projection", height=400)
+    return fig
+
+
+# Charts whose content never changes, built once per process
+STATIC_CHARTS: Dict[str, Callable] = {
+    "market_size": build_market_chart,
+    "revenue_projection": build_revenue_chart
+}
+
+
+def static_chart_json(name: str) -> str:
+    """Serialized static chart, built on first request"""
+    return FIGURE_CACHE.get_or_build(("static", name), lambda: STATIC_CHARTS[name]().to_json())
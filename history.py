@@ -0,0 +1,184 @@
+"""
+Compact per-session analysis history for LegalAI Simplifier
+
+Only scores, document types and clause references are kept, never document
+text: a clause is recorded by its section, page and configured clause name,
+not by the heading written in the document. Each session holds at most a fixed number of records within a
+memory budget. Records pushed out of memory are dropped, or appended to a
+JSONL file when a spill directory is configured.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import DOCUMENT_TYPES, HISTORY_CONFIG
+
+
+@dataclass(frozen=True, slots=True)
+class ClauseRef:
+    """Where a key clause sits in the analyzed document"""
+    section: str
+    name: str  # configured clause name or section label, see clause_label
+    page_reference: str
+
+
+def clause_label(heading: str, section: str, document_type: str) -> str:
+    """Configured name of the clause a heading introduces, else its section label"""
+    heading = heading.lower()
+    for common in DOCUMENT_TYPES.get(document_type, {}).get("common_clauses", []):
+        phrase = common.replace("_", " ")
+        if phrase in heading or phrase.replace(" ", "-") in heading:
+            return phrase.title()
+    return f"Section {section}" if section else "Key Clause"
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryRecord:
+    """Summary of one analysis"""
+    record_id: str
+    timestamp: float
+    document_type: str
+    confidence_score: float
+    risk_counts: Tuple[int, int, int]  # high, medium, low
+    clauses: Tuple[ClauseRef, ...]
+
+    @classmethod
+    def from_analysis(cls, analysis: Dict) -> "HistoryRecord":
+        """Summarize an analysis result"""
+        risks = [risk["risk"] for risk in analysis.get("risk_assessment", [])]
+        clauses = []
+        for clause in analysis.get("key_clauses", []):
+            section = clause.get("section", "")
+            name = clause_label(clause["name"], section, analysis["document_type"])
+            clauses.append(ClauseRef(section, name, clause.get("page_reference", "")))
+        return cls(
+            record_id=uuid.uuid4().hex,
+            timestamp=time.time(),
+            document_type=analysis["document_type"],
+            confidence_score=float(analysis["confidence_score"]),
+            risk_counts=(risks.count("high"), risks.count("medium"), risks.count("low")),
+            clauses=tuple(clauses)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HistoryRecord":
+        """Rebuild a record from to_dict() output"""
+        return cls(
+            record_id=data["record_id"],
+            timestamp=data["timestamp"],
+            document_type=data["document_type"],
+            confidence_score=data["confidence_score"],
+            risk_counts=tuple(data["risk_counts"]),
+            clauses=tuple(ClauseRef(**clause) for clause in data["clauses"])
+        )
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form of the record"""
+        return asdict(self)
+
+    def memory_size(self) -> int:
+        """Approximate bytes held by the record"""
+        size = sys.getsizeof(self) + sys.getsizeof(self.clauses) + sys.getsizeof(self.risk_counts)
+        size += sys.getsizeof(self.record_id) + sys.getsizeof(self.document_type)
+        for clause in self.clauses:
+            size += sys.getsizeof(clause) + sum(
+                sys.getsizeof(value) for value in (clause.section, clause.name, clause.page_reference)
+            )
+        return size
+
+
+class AnalysisHistory:
+    """Fixed-capacity ring buffer of history records
+
+    The oldest record is evicted when the buffer is full or the records
+    exceed max_bytes; evicted records are spilled to disk if spill_dir is set.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, max_bytes: Optional[int] = None,
+                 spill_dir: Optional[str] = None):
+        self.capacity = capacity or HISTORY_CONFIG["capacity"]
+        self.max_bytes = max_bytes or HISTORY_CONFIG["max_memory_kb"] * 1024
+        self.spill_dir = spill_dir if spill_dir is not None else HISTORY_CONFIG["spill_dir"]
+        self.history_id = uuid.uuid4().hex
+
+        self._slots: List[Optional[HistoryRecord]] = [None] * self.capacity
+        self._sizes = [0] * self.capacity
+        self._head = 0  # slot of the oldest record
+        self._count = 0
+        self.current_bytes = 0
+        self.spilled = 0
+        self._lock = threading.Lock()
+
+    @property
+    def spill_path(self) -> Optional[str]:
+        """JSONL file receiving evicted records, if spilling is enabled"""
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"history-{self.history_id}.jsonl")
+
+    def append(self, record: HistoryRecord) -> HistoryRecord:
+        """Add a record, evicting the oldest ones to stay within capacity and budget"""
+        size = record.memory_size()
+        with self._lock:
+            if self._count == self.capacity:
+                self._evict_oldest()
+            tail = (self._head + self._count) % self.capacity
+            self._slots[tail] = record
+            self._sizes[tail] = size
+            self._count += 1
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._count > 1:
+                self._evict_oldest()
+        return record
+
+    def _evict_oldest(self):
+        """Drop the oldest record, spilling it if enabled; caller must hold the lock"""
+        record = self._slots[self._head]
+        if self.spill_path:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record.to_dict()) + "\n")
+            self.spilled += 1
+
+        self.current_bytes -= self._sizes[self._head]
+        self._slots[self._head] = None
+        self._sizes[self._head] = 0
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[HistoryRecord]:
+        """In-memory records, oldest first"""
+        with self._lock:
+            records = [self._slots[(self._head + offset) % self.capacity] for offset in range(self._count)]
+        return iter(records)
+
+    def get(self, record_id: str) -> Optional[HistoryRecord]:
+        """Find an in-memory record by ID"""
+        return next((record for record in self if record.record_id == record_id), None)
+
+    def iter_spilled(self) -> Iterator[HistoryRecord]:
+        """Records previously spilled to disk, oldest first"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, encoding="utf-8") as handle:
+            for line in handle:
+                yield HistoryRecord.from_dict(json.loads(line))
+
+    def clear(self):
+        """Forget every record, including any spilled to disk"""
+        with self._lock:
+            self._slots = [None] * self.capacity
+            self._sizes = [0] * self.capacity
+            self._head = self._count = self.current_bytes = 0
+            if self.spill_path and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
@@ -0,0 +1,188 @@
+"""
+Incremental re-analysis for LegalAI Simplifier
+
+IncrementalAnalyzer keeps per-clause results for the previous version of a
+document, keyed by a digest of the clause text: the clause's keyword
+matches and classifier term counts, and for the document type its risk
+pattern hits and key clause result. After an edit only the clauses that
+changed are scanned and scored again; the document type, risk assessment
+and key clauses are assembled from the per-clause results.
+
+Some work still covers the whole document on every version: clause
+segmentation and the clause digests (two linear passes over the text), the
+analysis confidence, the source citations, and the summary and
+recommendations. A document without numbered clauses has its key clauses
+found by the engine's whole-text search. When the changed clauses add up to
+more than AI_CONFIG["max_document_length"], as on a first pass over a long
+contract, they are scanned in parallel by a ChunkedAnalyzer.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from chunking import ChunkedAnalyzer
+from classifier import get_document_classifier
+from config import AI_CONFIG
+from engine import RISK_RANK, LegalAIEngine
+from matcher import KeywordMatch, get_legal_matcher
+from segmenter import ClauseIndex, segment_document
+
+
+def clause_digest(text: str) -> bytes:
+    """Content key for one clause's text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class ClauseScan(NamedTuple):
+    """Keyword results for one clause's text"""
+    start: int  # offset the clause was scanned at
+    matches: Tuple[KeywordMatch, ...]  # at document offsets for that start
+    term_counts: Dict[int, int]  # classifier term counts, by matrix row
+
+
+class ClauseScore(NamedTuple):
+    """One clause's part of the analysis for a document type"""
+    pattern_hits: Tuple[Tuple[str, int], ...]  # first hit of each risk pattern, from the clause start
+    entry: Optional[Dict]  # key clause result; None for the preamble
+
+
+class IncrementalAnalyzer:
+    """Analyzes successive versions of one document, rescoring changed clauses
+
+    Results are kept only for the latest version, so memory stays
+    proportional to one document's clauses. Keywords never span a line
+    break and every clause starts on a new line, so clause by clause
+    scanning and scoring give exactly what a full analysis would.
+    """
+
+    def __init__(self, engine: LegalAIEngine, chunked: Optional[ChunkedAnalyzer] = None):
+        self.engine = engine
+        self.chunked = chunked  # scans large sets of changed clauses in parallel
+        self._scans: Dict[bytes, ClauseScan] = {}
+        self._scores: Dict[Tuple[bytes, str], ClauseScore] = {}
+        self._lock = threading.Lock()
+        self.changed_clauses: List[int] = []  # positions rescanned in the latest version
+        self.reused_clauses = 0
+        self.rescored_clauses = 0  # clauses scored afresh in the latest analysis
+        self.clause_index: Optional[ClauseIndex] = None  # segmentation of the latest version
+
+    def _scan_changed(self, text: str, spans: List[Tuple[int, int]]) -> List[Tuple[KeywordMatch, ...]]:
+        """Matches inside each changed clause, in parallel when there is a lot to scan"""
+        if self.chunked is not None and sum(end - start for start, end in spans) > AI_CONFIG["max_document_length"]:
+            return self.chunked.scan_spans(text, spans)
+        matcher = get_legal_matcher()
+        return [
+            tuple(match._replace(start=match.start + start, end=match.end + start)
+                  for match in matcher.iter_matches(text[start:end]))
+            for start, end in spans
+        ]
+
+    def scan(self, text: str) -> Tuple[ClauseIndex, List[bytes], List[ClauseScan]]:
+        """Segment text and scan its clauses, reusing unchanged ones
+
+        Returns the clause index with each clause's digest and scan.
+        """
+        clause_index = segment_document(text)
+        spans = list(zip(clause_index.starts.tolist(), clause_index.ends.tolist()))
+        keys = [clause_digest(text[start:end]) for start, end in spans]
+        changed = [position for position, key in enumerate(keys) if key not in self._scans]
+        found = self._scan_changed(text, [spans[position] for position in changed])
+
+        classifier = get_document_classifier()
+        fresh: Dict[bytes, ClauseScan] = {}
+        for position, matches in zip(changed, found):
+            fresh.setdefault(keys[position], ClauseScan(spans[position][0], matches,
+                                                        classifier.term_counts(text, matches)))
+
+        scans = [fresh.get(key) or self._scans[key] for key in keys]
+        self._scans = dict(zip(keys, scans))
+        self.clause_index = clause_index
+        self.changed_clauses = changed
+        self.reused_clauses = len(clause_index) - len(changed)
+        return clause_index, keys, scans
+
+    @staticmethod
+    def keyword_matches(clause_index: ClauseIndex, scans: List[ClauseScan]) -> List[KeywordMatch]:
+        """Every keyword match at its offset in the scanned version"""
+        matches: List[KeywordMatch] = []
+        for start, scan in zip(clause_index.starts.tolist(), scans):
+            if scan.start == start:
+                matches.extend(scan.matches)
+            else:
+                # Unchanged clause moved by an edit earlier in the document
+                shift = start - scan.start
+                matches.extend(KeywordMatch(match.start + shift, match.end + shift, match.term, match.labels)
+                               for match in scan.matches)
+        return matches
+
+    def _score(self, text: str, doc_type: str, clause_index: ClauseIndex, position: int,
+               scan: ClauseScan) -> ClauseScore:
+        """Risk pattern hits and key clause result of one clause"""
+        pattern = ("risk_pattern", doc_type)
+        level, hits, seen = "", [], set()
+        for match in scan.matches:
+            match_level = self.engine.match_risk_level(doc_type, match)
+            if RISK_RANK[match_level] > RISK_RANK[level]:
+                level = match_level
+            if pattern in match.labels and match.term not in seen:
+                seen.add(match.term)
+                hits.append((match.term, match.start - scan.start))
+
+        clause = clause_index.clause(text, position)
+        entry = self.engine.clause_entry(doc_type, clause, level) if clause.number else None
+        return ClauseScore(tuple(hits), entry)
+
+    def _assemble(self, text: str, doc_type: str, clause_index: ClauseIndex, keys: List[bytes],
+                  scans: List[ClauseScan]) -> Dict[str, Any]:
+        """Stage outputs built from per-clause results, scoring clauses not seen before"""
+        starts, ends = clause_index.starts.tolist(), clause_index.ends.tolist()
+        pages = clause_index.pages.tolist()
+        scores: Dict[Tuple[bytes, str], ClauseScore] = {}
+        hits, entries = [], []
+        self.rescored_clauses = 0
+
+        for position, (key, scan) in enumerate(zip(keys, scans)):
+            score = scores.get((key, doc_type)) or self._scores.get((key, doc_type))
+            if score is None:
+                score = self._score(text, doc_type, clause_index, position, scan)
+                self.rescored_clauses += 1
+            scores[(key, doc_type)] = score
+
+            start = starts[position]
+            hits.extend((term, start + offset) for term, offset in score.pattern_hits)
+            if score.entry is not None:
+                entries.append({**score.entry, "page_reference": f"Page {pages[position]}",
+                                "start": start, "end": ends[position]})
+        self._scores = scores
+
+        precomputed = {
+            "clause_index": clause_index,
+            "risk_assessment": self.engine.assess_pattern_risks(doc_type, clause_index, hits)
+        }
+        if entries:
+            precomputed["key_clauses"] = entries
+        else:
+            # No numbered clauses, so the engine searches the text for expected ones
+            precomputed["keyword_matches"] = self.keyword_matches(clause_index, scans)
+        return precomputed
+
+    def classify_and_analyze(self, text: str, on_stage: Optional[Callable[[str, Any], None]] = None,
+                             cancel_event: Optional[threading.Event] = None) -> Tuple[str, Dict]:
+        """Document type and full analysis of the latest version of the text"""
+        with self._lock:
+            clause_index, keys, scans = self.scan(text)
+
+            # Terms never span clauses, so per-clause counts add up to the document's
+            counts: Dict[int, int] = {}
+            for scan in scans:
+                for row, count in scan.term_counts.items():
+                    counts[row] = counts.get(row, 0) + count
+            doc_type, _ = get_document_classifier().classify_counts(counts)
+            precomputed = self._assemble(text, doc_type, clause_index, keys, scans)
+
+        if on_stage is not None:
+            on_stage("document_type", doc_type)
+
+        analysis = self.engine.analyze_document(text, doc_type, on_stage, cancel_event, precomputed=precomputed)
+        return doc_type, analysis
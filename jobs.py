@@ -0,0 +1,171 @@
+"""
+Background job queue for LegalAI Simplifier
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from config import AI_CONFIG
+from pipeline import PipelineCancelled
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """One background task with its progress and partial results"""
+    job_id: str
+    total_stages: int = 1
+    status: str = QUEUED
+    stage: str = ""
+    completed_stages: int = 0
+    partial: Dict[str, Any] = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has stopped, successfully or not"""
+        return self.status in FINISHED_STATES
+
+    @property
+    def progress(self) -> float:
+        """Fraction of stages completed"""
+        if self.status == DONE:
+            return 1.0
+        return min(self.completed_stages / max(self.total_stages, 1), 1.0)
+
+    def report(self, stage: str, output: Any):
+        """Record a finished stage and its output; called from worker threads"""
+        with self._lock:
+            self.partial[stage] = output
+            self.completed_stages += 1
+            self.stage = stage
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent copy of the job's state for display"""
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": self.progress,
+                "partial": dict(self.partial),
+                "result": self.result,
+                "error": self.error
+            }
+
+    def _start(self):
+        """Mark the job as picked up by a worker"""
+        with self._lock:
+            self.status = RUNNING
+
+    def _finish(self, status: str, result: Any = None, error: Optional[str] = None):
+        """Move to a final state"""
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+
+
+class JobQueue:
+    """Thread pool running jobs in the background, shared across sessions
+
+    Tasks receive their Job so they can report stage results as they go and
+    check job.cancel_event. Finished jobs are kept for retention_seconds so
+    the session that started them can collect the result.
+    """
+
+    def __init__(self, workers: Optional[int] = None, retention_seconds: Optional[float] = None):
+        self.workers = workers or AI_CONFIG["job_workers"]
+        self.retention_seconds = (
+            retention_seconds if retention_seconds is not None else AI_CONFIG["job_retention"]
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis-job")
+        self._jobs: Dict[str, Job] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, task: Callable[[Job], Any], total_stages: int = 1) -> str:
+        """Queue a task and return its job ID"""
+        self.prune()
+        job = Job(job_id=uuid.uuid4().hex, total_stages=total_stages)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._futures[job.job_id] = self._executor.submit(self._run, job, task)
+        return job.job_id
+
+    def get(self, job_id: Optional[str]) -> Optional[Job]:
+        """Look up a job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a job to stop; returns False if it had already finished"""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+
+        job.cancel_event.set()
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None and future.cancel():
+            job._finish(CANCELLED)
+        return True
+
+    @staticmethod
+    def _run(job: Job, task: Callable[[Job], Any]):
+        """Execute a task on a worker thread and record how it ended"""
+        if job.cancel_event.is_set():
+            job._finish(CANCELLED)
+            return
+
+        job._start()
+        try:
+            result = task(job)
+        except PipelineCancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            job._finish(FAILED, error=str(e))
+        else:
+            if job.cancel_event.is_set():
+                job._finish(CANCELLED)
+            else:
+                job._finish(DONE, result=result)
+
+    def prune(self):
+        """Forget finished jobs older than the retention period"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._futures.pop(job_id, None)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def shutdown(self):
+        """Cancel outstanding jobs and release the workers"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Load testing harness for LegalAI Simplifier
+
+Simulates concurrent users running upload -> analyze -> voice question and
+reports throughput, tail latency and memory per session at each concurrency
+level. Two targets are supported:
+
+- direct: every session calls the app's own functions from its own thread,
+  sharing the engine, analysis cache and job queue like the sessions of one
+  `streamlit run app.py` process do.
+- app: every session is a headless Streamlit AppTest of app.py, so each step
+  is a full script rerun including widget state and job polling.
+
+Usage:
+    python loadtest.py --sessions 1,4,16,64 --size 8k
+    python loadtest.py --target app --sessions 1,2,4,8 --output loadtest.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from corpus import DOC_TYPES, generate_document, parse_size
+
+STEPS = ("upload", "analyze", "voice")
+TARGETS = ("direct", "app")
+DEFAULT_LEVELS = (1, 2, 4, 8, 16)
+
+# One of the sample questions offered on the voice tab
+VOICE_QUESTION = "What are the main risks in this document?"
+DOCUMENT_TAB = "📄 Document Analysis"
+VOICE_TAB = "🎙️ Voice Interface"
+
+# How often a session checks on its analysis job; the app's fragment polls every 0.5s
+POLL_SECONDS = 0.01
+APP_TIMEOUT = 120
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    """Mean, p50, p95 and p99 in milliseconds"""
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "mean": round(float(latencies_ms.mean()), 2),
+        "p50": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p95": round(float(np.percentile(latencies_ms, 95)), 2),
+        "p99": round(float(np.percentile(latencies_ms, 99)), 2)
+    }
+
+
+@dataclass
+class LevelReport:
+    """Results for one concurrency level"""
+    sessions: int
+    flows: int = 0
+    errors: int = 0
+    wall_time: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+    step_latencies: Dict[str, List[float]] = field(default_factory=lambda: {step: [] for step in STEPS})
+    rss_before: int = 0
+    rss_after: int = 0
+    traced_peak: Optional[int] = None
+    last_error: Optional[str] = None
+
+    def fail(self, error: Exception, flows: int = 1):
+        """Count failed flows, keeping the latest error for the report"""
+        self.errors += flows
+        self.last_error = f"{type(error).__name__}: {error}"
+
+    @property
+    def throughput(self) -> float:
+        """Completed flows per second of wall time"""
+        return self.flows / self.wall_time if self.wall_time else 0.0
+
+    def summary(self) -> Dict:
+        """Report as a plain dict, latencies in milliseconds and memory in KB"""
+        report = {
+            "sessions": self.sessions,
+            "flows": self.flows,
+            "errors": self.errors,
+            "wall_time_s": round(self.wall_time, 3),
+            "throughput_flows_per_s": round(self.throughput, 2),
+            "latency_ms": _percentiles(self.latencies),
+            "step_latency_ms": {step: _percentiles(values) for step, values in self.step_latencies.items()},
+            "rss_mb": round(self.rss_after / 2**20, 1),
+            "rss_kb_per_session": round(max(self.rss_after - self.rss_before, 0) / 1024 / self.sessions, 1)
+        }
+        if self.last_error:
+            report["last_error"] = self.last_error
+        if self.traced_peak is not None:
+            report["traced_peak_kb_per_session"] = round(self.traced_peak / 1024 / self.sessions, 1)
+        return report
+
+
+class DirectSession:
+    """One simulated user calling the app functions without a browser"""
+
+    def __init__(self):
+        import app
+        self.app = app
+        self.state: Dict = {"incremental_analyzer": app.IncrementalAnalyzer(app.get_ai_engine())}
+
+    def upload(self, text: str, name: str):
+        upload = io.BytesIO(text.encode("utf-8"))
+        upload.name = name
+        self.state["document_text"] = self.app.DocumentProcessor.read_uploaded_document(upload)
+
+    def analyze(self, preferences: Dict):
+        queue = self.app.get_job_queue()
+        job_id = self.app.start_analysis_job(
+            self.state["document_text"], preferences, self.state["incremental_analyzer"]
+        )
+        job = queue.get(job_id)
+        while not job.done:
+            time.sleep(POLL_SECONDS)
+        if job.error:
+            raise RuntimeError(job.error)
+        self.state["analysis_results"] = job.result["analysis"]
+        self.state["retrieval_index"] = job.result["retrieval_index"]
+
+    def ask(self, question: str):
+        self.state["voice_response"] = self.app.VoiceInterface.process_voice_question(
+            question, self.state["retrieval_index"]
+        )
+
+
+class AppSession:
+    """One simulated user driving app.py through Streamlit's AppTest
+
+    AppTest installs a process-wide mock runtime for the length of each
+    script run, so reruns from different sessions take turns. Analysis jobs
+    still run concurrently on the shared job queue, and reruns are GIL-bound
+    Python either way.
+    """
+
+    _rerun_lock = threading.Lock()
+
+    def __init__(self):
+        from streamlit.testing.v1 import AppTest
+        app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+        self.at = AppTest.from_file(app_path, default_timeout=APP_TIMEOUT)
+        self._run(self.at.run)
+
+    def _run(self, rerun: Callable[[], object]):
+        """Rerun the script and raise if it failed"""
+        with self._rerun_lock:
+            rerun()
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def upload(self, text: str, name: str):
+        if self.at.session_state["main_tab"] != DOCUMENT_TAB:
+            self.at.session_state["main_tab"] = DOCUMENT_TAB
+            self._run(self.at.run)
+        self._run(self.at.radio[0].set_value("Text Input").run)
+        self._run(self.at.text_area[0].input(text).run)
+
+    def analyze(self, preferences: Dict):
+        self._run(self.at.button[0].click().run)
+        deadline = time.perf_counter() + APP_TIMEOUT
+        # The progress fragment reruns on a timer in a browser; here each poll is a rerun
+        while self.at.session_state.analysis_job_id is not None:
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Analysis did not finish in time")
+            time.sleep(POLL_SECONDS)
+            self._run(self.at.run)
+        if self.at.session_state.analysis_results is None:
+            raise RuntimeError("Analysis finished without results")
+
+    def ask(self, question: str):
+        # Tab selection is widget state, so it is set before each rerun on that tab
+        self.at.session_state["main_tab"] = VOICE_TAB
+        self._run(self.at.run)
+        self.at.session_state["main_tab"] = VOICE_TAB
+        self._run(self.at.button(key=question).click().run)
+
+
+SESSION_TYPES: Dict[str, Callable[[], object]] = {"direct": DirectSession, "app": AppSession}
+
+
+def run_flow(session, text: str, name: str, preferences: Dict) -> Dict[str, float]:
+    """Seconds spent in each step of one upload -> analyze -> voice flow"""
+    timings = {}
+    for step, call in (("upload", lambda: session.upload(text, name)),
+                       ("analyze", lambda: session.analyze(preferences)),
+                       ("voice", lambda: session.ask(VOICE_QUESTION))):
+        start = time.perf_counter()
+        call()
+        timings[step] = time.perf_counter() - start
+    return timings
+
+
+def run_level(sessions: int, target: str = "direct", size: int = 8 * 1024, iterations: int = 1,
+              seed: int = 0, trace_memory: bool = False) -> LevelReport:
+    """Run sessions concurrent users through the flow iterations times each"""
+    from utils import SessionManager
+
+    report = LevelReport(sessions=sessions)
+    preferences = dict(SessionManager.DEFAULT_PREFERENCES)
+    # A distinct document per flow, so the shared analysis cache doesn't hide the work
+    documents = [
+        [generate_document(DOC_TYPES[(user + i) % len(DOC_TYPES)], size, seed=seed + user * iterations + i)
+         for i in range(iterations)]
+        for user in range(sessions)
+    ]
+    live: List[object] = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(sessions + 1)
+
+    def user(index: int):
+        session, error = None, None
+        try:
+            session = SESSION_TYPES[target]()
+        except Exception as e:
+            error = e
+        start_barrier.wait()
+        if session is None:
+            with lock:
+                report.fail(error, iterations)
+            return
+        for i, text in enumerate(documents[index]):
+            try:
+                timings = run_flow(session, text, f"contract-{index}-{i}.txt", preferences)
+            except Exception as e:
+                with lock:
+                    report.fail(e)
+                continue
+            with lock:
+                report.flows += 1
+                report.latencies.append(sum(timings.values()))
+                for step, seconds in timings.items():
+                    report.step_latencies[step].append(seconds)
+        with lock:
+            # Held until the level ends so retained session state shows up in memory
+            live.append(session)
+
+    gc.collect()
+    report.rss_before = _rss_bytes()
+    if trace_memory:
+        tracemalloc.start()
+    threads = [threading.Thread(target=user, args=(index,), name=f"loadtest-{index}") for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    report.wall_time = time.perf_counter() - started
+
+    gc.collect()
+    report.rss_after = _rss_bytes()
+    if trace_memory:
+        report.traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    live.clear()
+    return report
+
+
+def run_load_test(levels: Tuple[int, ...] = DEFAULT_LEVELS, target: str = "direct", size: int = 8 * 1024,
+                  iterations: int = 1, seed: int = 0, trace_memory: bool = False) -> Dict:
+    """Run every concurrency level and collect the summaries"""
+    if target not in SESSION_TYPES:
+        raise ValueError(f"Unknown load test target: {target}")
+
+    # Warm-up so imports and cached resources aren't billed to the first level
+    run_level(1, target, size, 1, seed=seed - 1)
+
+    results = []
+    offset = seed
+    for sessions in levels:
+        results.append(run_level(sessions, target, size, iterations, offset, trace_memory).summary())
+        offset += sessions * iterations
+    return {
+        "meta": {"target": target, "size": size, "iterations": iterations, "cpu_count": os.cpu_count()},
+        "levels": results
+    }
+
+
+def format_table(report: Dict) -> str:
+    """Human readable results table"""
+    lines = [f"{'sessions':>8} {'flows':>6} {'errors':>6} {'flows/s':>9} {'p50 ms':>10} {'p99 ms':>10} "
+             f"{'analyze p99':>12} {'RSS MB':>8} {'KB/session':>11}"]
+    for level in report["levels"]:
+        lines.append(
+            f"{level['sessions']:>8} {level['flows']:>6} {level['errors']:>6} {level['throughput_flows_per_s']:>9.2f} "
+            f"{level['latency_ms']['p50']:>10.1f} {level['latency_ms']['p99']:>10.1f} "
+            f"{level['step_latency_ms']['analyze']['p99']:>12.1f} {level['rss_mb']:>8.1f} "
+            f"{level.get('traced_peak_kb_per_session', level['rss_kb_per_session']):>11.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test LegalAI Simplifier with concurrent sessions")
+    parser.add_argument("--target", choices=TARGETS, default="direct",
+                        help="call the app functions directly or drive app.py through AppTest")
+    parser.add_argument("--sessions", default=",".join(str(level) for level in DEFAULT_LEVELS),
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--size", default="8k", help="characters per document, e.g. 8k or 1m")
+    parser.add_argument("--iterations", type=int, default=1, help="flows per session at each level")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="report traced Python allocations per session (slows every level)")
+    parser.add_argument("--output", help="write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(
+        tuple(int(level) for level in args.sessions.split(",") if level), args.target,
+        parse_size(args.size), args.iterations, args.seed, args.trace_memory
+    )
+    print(format_table(report))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    return 1 if any(level["errors"] for level in report["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Single-pass multi-keyword matching for LegalAI Simplifier
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Iterator, List, NamedTuple, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    """A keyword hit with its character offsets in the scanned text"""
+    start: int
+    end: int
+    term: str
+    labels: Tuple[Hashable, ...]
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds every keyword in one linear pass"""
+
+    def __init__(self, vocabularies: Dict[Hashable, Iterable[str]]):
+        # A term may appear under several labels, e.g. "confidential" is both a
+        # classifier keyword and part of a risk vocabulary
+        term_labels: Dict[str, List[Hashable]] = {}
+        for label, terms in vocabularies.items():
+            for term in terms:
+                term = term.lower()
+                if term and label not in term_labels.setdefault(term, []):
+                    term_labels[term].append(label)
+
+        self.terms = list(term_labels)
+        self.term_labels = [tuple(term_labels[term]) for term in self.terms]
+        self._build(self.terms)
+
+    def _build(self, terms: List[str]):
+        """Compile the keyword trie into a deterministic transition table"""
+        transitions: List[Dict[str, int]] = [{}]
+        outputs: List[Tuple[int, ...]] = [()]
+
+        for term_id, term in enumerate(terms):
+            state = 0
+            for char in term:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions[state][char] = next_state
+                    transitions.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] += (term_id,)
+
+        # Breadth-first pass fills in failure links so that every state knows
+        # where to continue for any character, which keeps scanning linear
+        fail = [0] * len(transitions)
+        delta: List[Dict[str, int]] = [dict(transitions[0])] + [None] * (len(transitions) - 1)
+        queue = deque(transitions[0].values())
+
+        while queue:
+            state = queue.popleft()
+            outputs[state] += outputs[fail[state]]
+            delta[state] = {**delta[fail[state]], **transitions[state]}
+            for char, child in transitions[state].items():
+                fail[child] = delta[fail[state]].get(char, 0) if state else 0
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = outputs
+
+    def iter_matches(self, text: str) -> Iterator[KeywordMatch]:
+        """Yield every keyword occurrence, including overlapping ones"""
+        delta, outputs = self._delta, self._outputs
+        state = 0
+
+        # Offsets must index the original text, but a few characters such as
+        # "İ" lowercase to more than one; lowercase those one at a time
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = "".join(char.lower()[0] for char in text)
+
+        for position, char in enumerate(lowered):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                end = position + 1
+                for term_id in outputs[state]:
+                    term = self.terms[term_id]
+                    yield KeywordMatch(end - len(term), end, term, self.term_labels[term_id])
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Return all keyword matches ordered by end offset"""
+        return list(self.iter_matches(text))
+
+    def scan(self, text: str) -> Dict[Hashable, Dict[str, List[int]]]:
+        """Group match start offsets by label and then by term"""
+        hits: Dict[Hashable, Dict[str, List[int]]] = {}
+        for match in self.iter_matches(text):
+            for label in match.labels:
+                hits.setdefault(label, {}).setdefault(match.term, []).append(match.start)
+        return hits
+
+
+@lru_cache(maxsize=1)
+def get_legal_matcher() -> KeywordMatcher:
+    """Shared automaton over every risk and classification vocabulary"""
+    # Imported here because utils, engine and classifier use this module themselves
+    from classifier import CLASSIFIER_LABEL, get_document_classifier
+    from engine import LEGAL_KNOWLEDGE_BASE
+    from utils import RiskAssessor
+
+    vocabularies: Dict[Hashable, Iterable[str]] = {}
+    for level, keywords in RiskAssessor.RISK_KEYWORDS.items():
+        vocabularies[("risk_level", level)] = keywords
+    vocabularies[CLASSIFIER_LABEL] = get_document_classifier().terms
+    for doc_type, knowledge in LEGAL_KNOWLEDGE_BASE.items():
+        vocabularies[("risk_pattern", doc_type)] = knowledge["risk_patterns"]
+
+    return KeywordMatcher(vocabularies)
@@ -0,0 +1,257 @@
+"""
+Lightweight latency and cache instrumentation for LegalAI Simplifier
+
+Metrics are kept in process memory and exposed in Prometheus text format.
+When METRICS_CONFIG["enabled"] is off, instrumented calls skip timing and
+context managers are a shared no-op, so the cost is a single flag check.
+"""
+
+import bisect
+import functools
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import METRICS_CONFIG
+
+_NOOP = nullcontext()
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    """Render a Prometheus label set"""
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        """Add to the counter for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for a label set"""
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        """Prometheus text lines for this counter"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        """Record one observation for a label set"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict]:
+        """Count, mean and bucket-estimated p50/p99 per label set"""
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+        summary = {}
+        for key, (counts, total, count) in series.items():
+            summary[key] = {
+                "count": count,
+                "mean": total / count if count else 0.0,
+                "p50": self._quantile(counts, count, 0.5),
+                "p99": self._quantile(counts, count, 0.99)
+            }
+        return summary
+
+    def _quantile(self, counts: List[int], count: int, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        target, running = q * count, 0
+        for index, bucket_count in enumerate(counts):
+            running += bucket_count
+            if running >= target and bucket_count:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return 0.0
+
+    def render(self) -> List[str]:
+        """Prometheus text lines for this histogram"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                running = 0
+                for bound, bucket_count in zip(self.buckets + [float("inf")], counts):
+                    running += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_label = f'le="{le}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, bucket_label)} {running}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, returning the existing one if the name is taken"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def render(self) -> str:
+        """Prometheus text exposition of every registered metric"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "legalai_stage_duration_seconds", "Time spent in each analysis stage",
+    METRICS_CONFIG["latency_buckets"], ("stage",)
+))
+DOCUMENT_SIZE = REGISTRY.register(Histogram(
+    "legalai_document_size_chars", "Size of analyzed documents in characters",
+    METRICS_CONFIG["size_buckets"]
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "legalai_cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+))
+
+
+def is_enabled() -> bool:
+    """Whether metrics are being collected"""
+    return METRICS_CONFIG["enabled"]
+
+
+def set_enabled(enabled: bool):
+    """Turn collection on or off at runtime"""
+    METRICS_CONFIG["enabled"] = enabled
+
+
+def timed(stage: str) -> Callable:
+    """Decorator recording a function's duration under a stage name"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS_CONFIG["enabled"]:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def _tracked(stage: str):
+    """Time a block and record it under a stage name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage)
+
+
+def track(stage: str):
+    """Context manager recording the duration of a block under a stage name"""
+    return _tracked(stage) if is_enabled() else _NOOP
+
+
+def observe_stages(timings: Dict[str, float]):
+    """Record already measured stage timings"""
+    if is_enabled():
+        for stage, seconds in timings.items():
+            STAGE_SECONDS.observe(seconds, stage=stage)
+
+
+def observe_document_size(characters: int):
+    """Record the size of an analyzed document"""
+    if is_enabled():
+        DOCUMENT_SIZE.observe(characters)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a cache hit or miss"""
+    if is_enabled():
+        CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the registry at /metrics"""
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve /metrics from a daemon thread"""
+    server = ThreadingHTTPServer((host, METRICS_CONFIG["port"] if port is None else port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def serve_metrics(port: Optional[int] = None, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Start the /metrics endpoint, or carry on without it if the port is taken
+
+    Several app processes on one host share METRICS_CONFIG["port"]; the first
+    one serves it. Port 0 gives each process its own free port instead.
+    """
+    try:
+        server = start_metrics_server(port, host)
+    except OSError as e:
+        print(f"Metrics endpoint not started: {e}", file=sys.stderr)
+        return None
+    print(f"Metrics served at http://{host}:{server.server_address[1]}/metrics", file=sys.stderr)
+    return server
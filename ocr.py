@@ -0,0 +1,154 @@
+"""
+Parallel OCR for scanned legal documents
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from config import OCR_CONFIG, SECURITY_CONFIG
+from metrics import record_cache
+
+
+class PageImage(NamedTuple):
+    """Raw pixels of one scanned page, cheap to hash and send to workers"""
+    mode: str
+    size: Tuple[int, int]
+    data: bytes
+
+    @property
+    def digest(self) -> str:
+        """Content hash used as the OCR cache key"""
+        digest = hashlib.sha256(f"{self.mode}:{self.size}".encode("utf-8"))
+        digest.update(self.data)
+        return digest.hexdigest()
+
+
+def split_pages(image_file) -> List[PageImage]:
+    """Split a single or multi-page image (e.g. TIFF) into pages"""
+    from PIL import Image, ImageSequence
+
+    with Image.open(image_file) as image:
+        pages = []
+        for frame in ImageSequence.Iterator(image):
+            page = frame.convert("L") if frame.mode not in ("1", "L", "RGB") else frame.copy()
+            pages.append(PageImage(page.mode, page.size, page.tobytes()))
+        return pages
+
+
+def tesseract_recognize(page: PageImage, language: str) -> str:
+    """Run Tesseract on one page; executed inside a worker process"""
+    import pytesseract
+    from PIL import Image
+
+    image = Image.frombytes(page.mode, page.size, page.data)
+    return pytesseract.image_to_string(image, lang=language)
+
+
+class OCREngine:
+    """Fan scanned pages out across a process pool with a per-page result cache"""
+
+    def __init__(self, recognizer: Callable[[PageImage, str], str] = tesseract_recognize,
+                 workers: Optional[int] = None, language: Optional[str] = None,
+                 cache_pages: Optional[int] = None, cache_text: Optional[bool] = None):
+        self.recognizer = recognizer
+        self.workers = workers or OCR_CONFIG["workers"] or os.cpu_count() or 1
+        self.language = language or OCR_CONFIG["language"]
+        self.cache_pages = OCR_CONFIG["cache_pages"] if cache_pages is None else cache_pages
+
+        # Recognized text is document content, so it is only kept across
+        # calls when the retention policy allows it, and only for that long
+        retention_minutes = SECURITY_CONFIG["document_retention_time"]
+        self.cache_text = retention_minutes > 0 if cache_text is None else cache_text
+        self.cache_ttl = retention_minutes * 60 if retention_minutes > 0 else float("inf")
+
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Worker pool reused across documents"""
+        if self._executor is None:
+            # Forking a multithreaded server process can deadlock the children
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _cached(self, digest: str) -> Optional[str]:
+        """Return cached text for a page hash, or None"""
+        if not self.cache_text or not self.cache_pages:
+            return None
+        with self._lock:
+            entry = self._cache.get(digest)
+            if entry is None or entry[1] < time.monotonic():
+                self._cache.pop(digest, None)
+                self.misses += 1
+                record_cache("ocr", hit=False)
+                return None
+            self._cache.move_to_end(digest)
+            self.hits += 1
+            record_cache("ocr", hit=True)
+            return entry[0]
+
+    def _store(self, digest: str, text: str):
+        """Cache recognized text when the retention policy allows it"""
+        if not self.cache_text or not self.cache_pages:
+            return
+        with self._lock:
+            self._cache[digest] = (text, time.monotonic() + self.cache_ttl)
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_pages:
+                self._cache.popitem(last=False)
+
+    def recognize_pages(self, pages: List[PageImage]) -> List[str]:
+        """OCR every page in parallel, returning text in page order"""
+        digests = [page.digest for page in pages]
+        results: Dict[str, str] = {}
+
+        # Identical pages (blank separators, repeated exhibits) are recognized once
+        todo = {}
+        for digest, page in zip(digests, pages):
+            if digest in results or digest in todo:
+                continue
+            cached = self._cached(digest)
+            if cached is not None:
+                results[digest] = cached
+            else:
+                todo[digest] = page
+
+        if len(todo) <= 1 or self.workers == 1:
+            texts = [self.recognizer(page, self.language) for page in todo.values()]
+        else:
+            texts = self.executor.map(self.recognizer, todo.values(), [self.language] * len(todo))
+
+        for digest, text in zip(todo, texts):
+            results[digest] = text
+            self._store(digest, text)
+
+        return [results[digest] for digest in digests]
+
+    def recognize(self, image_file) -> List[str]:
+        """OCR an image file, returning one text entry per page"""
+        return self.recognize_pages(split_pages(image_file))
+
+    def shutdown(self):
+        """Release the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+@lru_cache(maxsize=1)
+def get_ocr_engine() -> OCREngine:
+    """Process-wide OCR engine so the worker pool is started once"""
+    return OCREngine()
@@ -0,0 +1,169 @@
+"""
+Staged analysis pipeline for LegalAI Simplifier
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from metrics import observe_stages
+
+# How often a run checks for cancellation while stages are executing
+CANCEL_POLL_SECONDS = 0.05
+
+
+class PipelineCancelled(Exception):
+    """Raised when a pipeline run is cancelled before all stages finish"""
+
+
+@dataclass
+class Stage:
+    """A named analysis step and the inputs it needs"""
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    internal: bool = False  # shared with other stages but not reported as output
+
+
+@dataclass
+class PipelineResult:
+    """Outputs of a pipeline run with per-stage timings in seconds"""
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    internals: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    total_time: float = 0.0
+
+
+class AnalysisPipeline:
+    """Run analysis stages in dependency order, independent stages in parallel"""
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4):
+        names = [stage.name for stage in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Pipeline stage names must be unique")
+
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        """Reject stage graphs with circular dependencies"""
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done or name not in self.stages:
+                return
+            if name in visiting:
+                raise ValueError(f"Circular dependency at pipeline stage '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool shared by every run of this pipeline"""
+        # Runs from API workers, queued jobs and sessions can all start at once
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="analysis-stage"
+                )
+            return self._executor
+
+    @staticmethod
+    def _timed_call(stage: Stage, args: List[Any]) -> Tuple[Any, float]:
+        """Run a stage and measure how long it took"""
+        start = time.perf_counter()
+        output = stage.func(*args)
+        return output, time.perf_counter() - start
+
+    def run(self, context: Dict[str, Any],
+            on_stage: Optional[Callable[[str, Any], None]] = None,
+            cancel_event: Optional[threading.Event] = None) -> PipelineResult:
+        """Execute every stage; context supplies the external inputs
+
+        A stage whose output is already in context is not run again, nor is
+        an internal stage that no remaining stage needs. on_stage
+        is called with each stage's name and output as soon as it finishes,
+        starting with those supplied. Setting cancel_event stops the run and
+        raises PipelineCancelled; stages already executing are left to finish.
+        """
+        missing = {
+            dependency
+            for stage in self.stages.values()
+            for dependency in stage.inputs
+            if dependency not in self.stages and dependency not in context
+        }
+        if missing:
+            raise KeyError(f"Missing pipeline inputs: {', '.join(sorted(missing))}")
+
+        start = time.perf_counter()
+        result = PipelineResult()
+        available = dict(context)
+        pending = {name: stage for name, stage in self.stages.items() if name not in context}
+        # Walk back from the reported stages to the internal ones they need;
+        # the list grows as it is iterated
+        needed = [name for name, stage in pending.items() if not stage.internal]
+        for name in needed:
+            needed.extend(dependency for dependency in pending[name].inputs
+                          if dependency in pending and dependency not in needed)
+        pending = {name: stage for name, stage in pending.items() if name in needed}
+        running = {}
+
+        for name in self.stages:
+            if name in context:
+                result.outputs[name] = context[name]
+                if on_stage is not None:
+                    on_stage(name, context[name])
+
+        try:
+            while pending or running:
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dependency in available for dependency in stage.inputs)
+                ]
+                for stage in ready:
+                    del pending[stage.name]
+                    args = [available[dependency] for dependency in stage.inputs]
+                    running[self.executor.submit(self._timed_call, stage, args)] = stage.name
+
+                if cancel_event is not None and cancel_event.is_set():
+                    raise PipelineCancelled("Analysis cancelled")
+
+                timeout = CANCEL_POLL_SECONDS if cancel_event is not None else None
+                finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    output, elapsed = future.result()
+                    available[name] = output
+                    result.outputs[name] = output
+                    result.timings[name] = elapsed
+                    if on_stage is not None:
+                        on_stage(name, output)
+        finally:
+            for future in running:
+                future.cancel()
+
+        # Report stages in declaration order regardless of completion order
+        result.internals = {name: result.outputs[name] for name, stage in self.stages.items()
+                            if stage.internal and name in result.outputs}
+        result.outputs = {name: result.outputs[name] for name, stage in self.stages.items() if not stage.internal}
+        result.timings = {name: result.timings[name] for name in self.stages if name in result.timings}
+        result.total_time = time.perf_counter() - start
+        observe_stages(result.timings)
+        return result
+
+    def shutdown(self):
+        """Release the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+PDF report rendering for LegalAI Simplifier
+
+Layout templates (styles, section order, table styling, header text) are
+compiled once per document type and charts are drawn once per value, then
+reused by every report. Many reports are rendered on a process pool.
+
+Usage:
+    python reports.py results.jsonl --output-dir reports/
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, TextIO, Tuple
+from xml.sax.saxutils import escape
+
+from reportlab.graphics.charts.barcharts import HorizontalBarChart
+from reportlab.graphics.shapes import Drawing, Rect, String
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from config import DOCUMENT_TYPES, UI_CONFIG
+
+RISK_COLORS = {
+    "high": colors.HexColor(UI_CONFIG["theme"]["error_color"]),
+    "medium": colors.HexColor(UI_CONFIG["theme"]["warning_color"]),
+    "low": colors.HexColor(UI_CONFIG["theme"]["success_color"])
+}
+
+# Section order per document type; risks lead for the types where they matter most
+SECTION_ORDER = {
+    "nda": ("summary", "risks", "clauses", "recommendations", "citations"),
+    "lease": ("risks", "summary", "clauses", "recommendations", "citations"),
+    "employment": ("risks", "summary", "clauses", "recommendations", "citations"),
+    "contract": ("summary", "risks", "clauses", "recommendations", "citations")
+}
+
+DISCLAIMER = (
+    "This report was generated automatically and is not legal advice. "
+    "Consult a qualified attorney before acting on it."
+)
+
+
+class ReportTemplate(NamedTuple):
+    """Compiled layout shared by every report of one document type"""
+    document_type: str
+    title: str
+    sections: Tuple[str, ...]
+    styles: Dict[str, ParagraphStyle]
+    risk_table_style: TableStyle
+    clause_table_style: TableStyle
+
+
+@lru_cache(maxsize=None)
+def get_report_template(document_type: str) -> ReportTemplate:
+    """Compile (once) the layout for a document type"""
+    name = DOCUMENT_TYPES.get(document_type, {}).get("name", "Legal Document")
+    primary = colors.HexColor(UI_CONFIG["theme"]["primary_color"])
+    base = getSampleStyleSheet()
+
+    styles = {
+        "title": ParagraphStyle("ReportTitle", parent=base["Title"], textColor=primary),
+        "subtitle": ParagraphStyle("ReportSubtitle", parent=base["Normal"], alignment=TA_CENTER,
+                                   textColor=colors.grey),
+        "heading": ParagraphStyle("ReportHeading", parent=base["Heading2"], textColor=primary, spaceBefore=12),
+        "body": ParagraphStyle("ReportBody", parent=base["BodyText"], leading=14),
+        "cell": ParagraphStyle("ReportCell", parent=base["BodyText"], fontSize=9, leading=11),
+        "small": ParagraphStyle("ReportSmall", parent=base["Italic"], fontSize=8, textColor=colors.grey)
+    }
+
+    header = [
+        ("BACKGROUND", (0, 0), (-1, 0), primary),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#F9FAFB")])
+    ]
+
+    return ReportTemplate(
+        document_type=document_type,
+        title=f"{name} Analysis",
+        sections=SECTION_ORDER.get(document_type, SECTION_ORDER["contract"]),
+        styles=styles,
+        risk_table_style=TableStyle(header),
+        clause_table_style=TableStyle(header)
+    )
+
+
+@lru_cache(maxsize=128)
+def confidence_chart(confidence_pct: int) -> Drawing:
+    """Horizontal confidence bar, drawn once per value"""
+    width, height = 6.5 * inch, 0.6 * inch
+    drawing = Drawing(width, height)
+    for low, high, color in ((0, 50, "#FEE2E2"), (50, 80, "#FEF3C7"), (80, 100, "#DCFCE7")):
+        drawing.add(Rect(width * low / 100, 12, width * (high - low) / 100, 16,
+                         fillColor=colors.HexColor(color), strokeColor=None))
+    drawing.add(Rect(0, 16, width * confidence_pct / 100, 8,
+                     fillColor=colors.HexColor(UI_CONFIG["theme"]["primary_color"]), strokeColor=None))
+    drawing.add(Rect(width * 0.9 - 1, 8, 2, 24, fillColor=colors.red, strokeColor=None))
+    drawing.add(String(0, 0, f"AI Confidence Level: {confidence_pct}%", fontName="Helvetica-Bold", fontSize=9))
+    return drawing
+
+
+@lru_cache(maxsize=128)
+def risk_chart(risk_counts: Tuple[int, int, int]) -> Drawing:
+    """Bar chart of high/medium/low risk counts, laid out once per distribution"""
+    drawing = Drawing(6.5 * inch, 1.2 * inch)
+    chart = HorizontalBarChart()
+    chart.x, chart.y = 50, 10
+    chart.width, chart.height = 5.5 * inch, 1.0 * inch
+    chart.data = [list(risk_counts)]
+    chart.categoryAxis.categoryNames = ["High", "Medium", "Low"]
+    chart.valueAxis.valueMin = 0
+    chart.valueAxis.valueMax = max(max(risk_counts), 1)
+    chart.valueAxis.valueStep = max(1, chart.valueAxis.valueMax // 4)
+    chart.bars.strokeColor = None
+    for index, level in enumerate(("high", "medium", "low")):
+        chart.bars[(0, index)].fillColor = RISK_COLORS[level]
+    drawing.add(chart)
+    # Lay the chart out now so cached copies are plain shapes, safe to draw from any thread
+    return drawing.expandUserNodes()
+
+
+def _paragraph(text, style: ParagraphStyle) -> Paragraph:
+    """Paragraph of plain text, with markup characters escaped"""
+    return Paragraph(escape(str(text)), style)
+
+
+def _section(name: str, analysis: Dict, template: ReportTemplate) -> List:
+    """Flowables for one report section"""
+    styles = template.styles
+
+    if name == "summary":
+        return [_paragraph("Plain Language Summary", styles["heading"]),
+                _paragraph(analysis.get("plain_language_summary", ""), styles["body"])]
+
+    if name == "risks":
+        risks = analysis.get("risk_assessment", [])
+        levels = [risk.get("risk") for risk in risks]
+        counts = (levels.count("high"), levels.count("medium"), levels.count("low"))
+        rows = [["Clause", "Risk", "Confidence", "Explanation"]]
+        for risk in risks:
+            rows.append([
+                _paragraph(risk.get("clause", ""), styles["cell"]),
+                str(risk.get("risk", "")).upper(),
+                f"{float(risk.get('confidence', 0)) * 100:.0f}%",
+                _paragraph(risk.get("explanation", ""), styles["cell"])
+            ])
+        table = Table(rows, colWidths=[1.5 * inch, 0.7 * inch, 0.9 * inch, 3.4 * inch], repeatRows=1)
+        table.setStyle(template.risk_table_style)
+        table.setStyle(TableStyle([
+            ("TEXTCOLOR", (1, row), (1, row), RISK_COLORS[level])
+            for row, level in enumerate(levels, 1) if level in RISK_COLORS
+        ]))
+        return [_paragraph("Risk Assessment", styles["heading"]), risk_chart(counts), table]
+
+    if name == "clauses":
+        clauses = analysis.get("key_clauses", [])
+        if not clauses:
+            return []
+        rows = [["Section", "Clause", "Page", "Excerpt"]]
+        for clause in clauses:
+            rows.append([
+                clause.get("section", ""),
+                _paragraph(clause.get("name", ""), styles["cell"]),
+                clause.get("page_reference", ""),
+                _paragraph(clause.get("content", ""), styles["cell"])
+            ])
+        table = Table(rows, colWidths=[0.7 * inch, 1.6 * inch, 0.7 * inch, 3.5 * inch], repeatRows=1)
+        table.setStyle(template.clause_table_style)
+        return [_paragraph("Key Clauses", styles["heading"]), table]
+
+    if name == "recommendations":
+        return [_paragraph("Recommendations", styles["heading"])] + [
+            _paragraph(f"• {recommendation}", styles["body"])
+            for recommendation in analysis.get("recommendations", [])
+        ]
+
+    if name == "citations":
+        return [_paragraph("Source Citations", styles["heading"])] + [
+            _paragraph(f"[{index}] {citation}", styles["body"])
+            for index, citation in enumerate(analysis.get("source_citations", []), 1)
+        ]
+
+    raise ValueError(f"Unknown report section: {name}")
+
+
+def render_pdf_report(analysis: Dict) -> bytes:
+    """Render one analysis as a PDF document"""
+    template = get_report_template(analysis.get("document_type", "contract"))
+    styles = template.styles
+    buffer = io.BytesIO()
+
+    def footer(canvas, document):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 8)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(document.leftMargin, 0.5 * inch, "LegalAI Simplifier")
+        canvas.drawRightString(document.pagesize[0] - document.rightMargin, 0.5 * inch, f"Page {document.page}")
+        canvas.restoreState()
+
+    document = SimpleDocTemplate(buffer, pagesize=LETTER, title=template.title, author="LegalAI Simplifier",
+                                 topMargin=0.75 * inch, bottomMargin=0.75 * inch)
+
+    confidence_pct = int(float(analysis.get("confidence_score", 0)) * 100)
+    story = [
+        _paragraph(template.title, styles["title"]),
+        _paragraph(f"Generated {datetime.now():%B %d, %Y %H:%M}", styles["subtitle"]),
+        Spacer(1, 12),
+        confidence_chart(confidence_pct)
+    ]
+    for section in template.sections:
+        story.extend(_section(section, analysis, template))
+    story.extend([Spacer(1, 18), _paragraph(DISCLAIMER, styles["small"])])
+
+    document.build(story, onFirstPage=footer, onLaterPages=footer)
+    return buffer.getvalue()
+
+
+def report_filename(document_id: str, taken: Optional[Set[str]] = None) -> str:
+    """Safe PDF file name for a document ID
+
+    IDs that sanitize to a name already in taken (compared case-insensitively,
+    as some file systems do) get a suffix from a hash of the ID, and the new
+    name is added to taken.
+    """
+    stem = re.sub(r"[^A-Za-z0-9._-]+", "_", str(document_id)).strip("._") or "report"
+    name = f"{stem}.pdf"
+    if taken is None:
+        return name
+
+    suffix = hashlib.sha256(str(document_id).encode("utf-8")).hexdigest()[:8]
+    attempt = 1
+    while name.lower() in taken:
+        name = f"{stem}-{suffix}.pdf" if attempt == 1 else f"{stem}-{suffix}-{attempt}.pdf"
+        attempt += 1
+    taken.add(name.lower())
+    return name
+
+
+def _write_report(path: str, analysis: Dict) -> str:
+    """Render a report to disk; executed inside a worker process"""
+    with open(path, "wb") as handle:
+        handle.write(render_pdf_report(analysis))
+    return path
+
+
+def render_reports(analyses: Iterable[Tuple[str, Dict]], directory: str,
+                   workers: Optional[int] = None, max_in_flight: Optional[int] = None) -> Iterator[str]:
+    """Write a PDF per (document_id, analysis) on a process pool, yielding paths as they finish
+
+    Each worker compiles the templates it needs once and reuses them for
+    every report it renders.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    os.makedirs(directory, exist_ok=True)
+    analyses = iter(analyses)
+    running = set()
+    taken: Set[str] = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            for document_id, analysis in analyses:
+                path = os.path.join(directory, report_filename(document_id, taken))
+                running.add(executor.submit(_write_report, path, analysis))
+                if len(running) >= max_in_flight:
+                    break
+
+            if not running:
+                break
+
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield future.result()
+
+
+def _open_results(path: str) -> TextIO:
+    """Text stream over batch.py output, decompressed by its .gz/.zst extension"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("Reading .zst results requires the zstandard package")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+                                encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def iter_batch_analyses(path: str) -> Iterator[Tuple[str, Dict]]:
+    """(id, analysis) pairs from batch.py output, skipping failed documents"""
+    with _open_results(path) as handle:
+        for line in handle:
+            record = json.loads(line) if line.strip() else {}
+            if "analysis" in record:
+                yield record["id"], record["analysis"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Render PDF reports for batch analysis results")
+    parser.add_argument("results", help="JSONL (or .jsonl.gz/.jsonl.zst) file written by batch.py")
+    parser.add_argument("-o", "--output-dir", default="reports", help="directory for the PDF files")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    count = sum(1 for _ in render_reports(iter_batch_analyses(args.results), args.output_dir, args.workers))
+    print(f"Wrote {count} reports to {args.output_dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
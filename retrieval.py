@@ -0,0 +1,138 @@
+"""
+BM25 retrieval over the clauses of a loaded document
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from segmenter import ClauseIndex, segment_document
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can do does for from has have how i if in is it its
+me my no not of on or our shall should so than that the their them then there
+these they this to was we what when where which who will with would you your
+""".split())
+
+# Standard BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Longest clause excerpt kept for answers
+EXCERPT_LENGTH = 240
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords, with plural endings folded"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class RetrievedClause(NamedTuple):
+    """A clause returned for a question, with its relevance"""
+    position: int
+    citation: str
+    excerpt: str
+    score: float
+    confidence: float
+
+
+class RetrievalIndex:
+    """Sparse BM25 index over one document's clauses
+
+    Postings are stored column-wise (one slice of clause ids and precomputed
+    BM25 weights per term), so a query only touches the postings of its own
+    terms and scoring is a handful of NumPy operations. Only a short excerpt
+    of each clause is kept, not the document text itself.
+    """
+
+    def __init__(self, text: str, clause_index: Optional[ClauseIndex] = None,
+                 excerpt_length: int = EXCERPT_LENGTH):
+        self.clause_index = clause_index if clause_index is not None else segment_document(text)
+        self.excerpts: List[str] = []
+        self._build(text, excerpt_length)
+
+    def _build(self, text: str, excerpt_length: int):
+        """Compute per-term postings with BM25 weights"""
+        vocabulary: Dict[str, int] = {}
+        term_ids, clause_ids = [], []
+
+        lengths = np.zeros(len(self.clause_index), dtype=np.float64)
+        for position, clause in enumerate(self.clause_index.iter_clauses(text)):
+            excerpt = " ".join(clause.text.split())
+            self.excerpts.append(excerpt[:excerpt_length] + ("..." if len(excerpt) > excerpt_length else ""))
+            tokens = tokenize(f"{clause.heading} {clause.text}")
+            lengths[position] = len(tokens)
+            for token in tokens:
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                clause_ids.append(position)
+
+        self.vocabulary = vocabulary
+        self.clause_count = len(lengths)
+
+        # Collapse (term, clause) pairs into term frequencies, grouped by term
+        pairs = np.array(term_ids, dtype=np.int64) * max(self.clause_count, 1) + np.array(clause_ids, dtype=np.int64)
+        unique_pairs, frequencies = np.unique(pairs, return_counts=True)
+        posting_terms = unique_pairs // max(self.clause_count, 1)
+        self.posting_clauses = (unique_pairs % max(self.clause_count, 1)).astype(np.int32)
+        self.indptr = np.searchsorted(posting_terms, np.arange(len(vocabulary) + 1))
+
+        document_frequency = np.diff(self.indptr)
+        idf = np.log(1 + (self.clause_count - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if self.clause_count and lengths.mean() else 1.0
+        norms = K1 * (1 - B + B * lengths[self.posting_clauses] / average_length)
+        self.posting_weights = idf[posting_terms] * frequencies * (K1 + 1) / (frequencies + norms)
+
+        # Best achievable weight per term, used to turn scores into confidences
+        self.max_weights = np.zeros(len(vocabulary))
+        if len(self.posting_weights):
+            np.maximum.at(self.max_weights, posting_terms, self.posting_weights)
+
+    def __len__(self) -> int:
+        return self.clause_count
+
+    def scores(self, question: str) -> np.ndarray:
+        """BM25 score of every clause for a question"""
+        scores = np.zeros(self.clause_count)
+        for term in set(tokenize(question)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            scores[self.posting_clauses[start:end]] += self.posting_weights[start:end]
+        return scores
+
+    def search(self, question: str, top_k: int = 3) -> List[RetrievedClause]:
+        """Top-k clauses for a question, best first"""
+        scores = self.scores(question)
+        attainable = sum(
+            self.max_weights[self.vocabulary[term]] for term in set(tokenize(question)) if term in self.vocabulary
+        )
+        if not attainable:
+            return []
+
+        top_k = min(top_k, self.clause_count)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        results = []
+        for position in best:
+            if scores[position] <= 0:
+                break
+            results.append(RetrievedClause(
+                position=int(position),
+                citation=self.clause_index.citation(int(position)),
+                excerpt=self.excerpts[position],
+                score=float(scores[position]),
+                confidence=float(min(scores[position] / attainable, 1.0))
+            ))
+        return results
@@ -0,0 +1,122 @@
+"""
+Clause segmentation for legal documents
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from utils import PAGE_BREAK
+
+# Numbered clause starts such as "1. CONFIDENTIAL INFORMATION", "2.1 Term" or
+# "Section 4: Termination" at the beginning of a line. A bare number needs a
+# delimiter so that lines like "30 days notice" are not taken for headings
+HEADING_PATTERN = re.compile(
+    r"^[ \t\f]*(?P<heading>(?:section|article|clause)[ \t]+(?P<named>\d{1,3}(?:\.\d{1,3})*)[.:)]?"
+    r"|(?P<number>\d{1,3}(?:\.\d{1,3})*)[.:)]|(?P<dotted>\d{1,3}(?:\.\d{1,3})+))"
+    r"[ \t]+(?P<title>\S[^\n]*)$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Longest heading kept when a numbered line runs straight into clause text
+MAX_HEADING_WORDS = 8
+
+
+class Clause(NamedTuple):
+    """One segment of a document resolved from the index"""
+    number: str
+    heading: str
+    start: int
+    end: int
+    page: int
+    text: str
+
+
+class ClauseIndex:
+    """Offset-based index of a document's numbered sections and clauses
+
+    Only offsets and headings are stored; clause text is sliced from the
+    document on demand, so the index stays small and holds no copy of it.
+    """
+
+    def __init__(self, numbers: List[str], headings: List[str], starts: np.ndarray,
+                 ends: np.ndarray, pages: np.ndarray, page_count: int = 1):
+        self.numbers = numbers
+        self.headings = headings
+        self.starts = starts
+        self.ends = ends
+        self.pages = pages
+        self.page_count = page_count
+
+    def __len__(self) -> int:
+        return len(self.headings)
+
+    def find(self, offset: int) -> Optional[int]:
+        """Position of the clause containing a character offset"""
+        position = int(np.searchsorted(self.starts, offset, side="right")) - 1
+        if position < 0 or offset >= self.ends[position]:
+            return None
+        return position
+
+    def locate(self, offsets) -> np.ndarray:
+        """Clause positions for many offsets at once (-1 where outside any clause)"""
+        offsets = np.asarray(offsets, dtype=np.int64)
+        positions = np.searchsorted(self.starts, offsets, side="right") - 1
+        if len(self):
+            inside = (positions >= 0) & (offsets < self.ends[np.maximum(positions, 0)])
+            positions[~inside] = -1
+        return positions
+
+    def clause(self, text: str, position: int) -> Clause:
+        """Resolve one indexed clause against the document text"""
+        start, end = int(self.starts[position]), int(self.ends[position])
+        return Clause(self.numbers[position], self.headings[position], start, end,
+                      int(self.pages[position]), text[start:end].strip())
+
+    def iter_clauses(self, text: str) -> Iterator[Clause]:
+        """Resolve every indexed clause in document order"""
+        for position in range(len(self)):
+            yield self.clause(text, position)
+
+    def citation(self, position: int) -> str:
+        """Human readable reference to a clause"""
+        number = self.numbers[position]
+        label = f"Section {number}" if number else "Preamble"
+        return f"{label}: {self.headings[position]} (Page {self.pages[position]})"
+
+
+def _heading_from(line: str) -> str:
+    """Use a short all-caps title as is, otherwise its first few words"""
+    line = line.strip().rstrip(".:")
+    if line.isupper():
+        return line.title()
+    words = line.split()
+    heading = " ".join(words[:MAX_HEADING_WORDS])
+    return heading + ("..." if len(words) > MAX_HEADING_WORDS else "")
+
+
+def segment_document(text: str) -> ClauseIndex:
+    """Split a document into numbered clauses in one pass over the text"""
+    numbers, headings, starts = [], [], []
+
+    for match in HEADING_PATTERN.finditer(text):
+        numbers.append(match.group("named") or match.group("number") or match.group("dotted"))
+        headings.append(_heading_from(match.group("title")))
+        starts.append(match.start("heading"))
+
+    # Text ahead of the first numbered clause (title, parties) is the preamble
+    preamble = text[:starts[0]] if starts else text
+    if not starts or preamble.strip():
+        first_line = next((line for line in preamble.splitlines() if line.strip()), "")
+        numbers.insert(0, "")
+        headings.insert(0, _heading_from(first_line) if first_line else "Preamble")
+        starts.insert(0, 0)
+
+    starts = np.array(starts, dtype=np.int64)
+    ends = np.append(starts[1:], len(text)).astype(np.int64)
+
+    page_breaks = np.array([match.start() for match in re.finditer(PAGE_BREAK, text)], dtype=np.int64)
+    pages = (np.searchsorted(page_breaks, starts, side="right") + 1).astype(np.int32)
+
+    return ClauseIndex(numbers, headings, starts, ends, pages, page_count=len(page_breaks) + 1)
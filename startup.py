@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Cold-start helpers for LegalAI Simplifier
+
+Heavy libraries (pandas, plotly) are imported through lazy_import() the first
+time a view needs them, and the time each one took is kept in IMPORT_TIMES.
+
+Run `python startup.py` to profile a cold import of app.py per package.
+"""
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+# Seconds spent on the first import of each lazily loaded module
+IMPORT_TIMES: Dict[str, float] = {}
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Import a module on first use, recording how long the import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES.setdefault(name, time.perf_counter() - start)
+    return module
+
+
+def profile_cold_start(target: str = "app", top: int = 20) -> List[Tuple[str, float, int]]:
+    """Import target in a fresh interpreter and return (package, ms, module_count)
+
+    Self time of every imported module is summed per top-level package, so
+    e.g. all of pandas' submodules are reported as one "pandas" row.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=here, capture_output=True, text=True
+    )
+
+    totals: Dict[str, List[float]] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        package = module.strip().split(".")[0]
+        entry = totals.setdefault(package, [0.0, 0])
+        entry[0] += int(self_us) / 1000
+        entry[1] += 1
+
+    rows = [(package, ms, count) for package, (ms, count) in totals.items()]
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Report import time per package for a cold start")
+    parser.add_argument("target", nargs="?", default="app", help="module to import (default: app)")
+    parser.add_argument("--top", type=int, default=20, help="number of packages to show")
+    args = parser.parse_args()
+
+    rows = profile_cold_start(args.target, args.top)
+    print(f"{'package':<30} {'import ms':>10} {'modules':>8}")
+    for package, milliseconds, count in rows:
+        print(f"{package:<30} {milliseconds:>10.1f} {count:>8}")
+    print(f"{'shown total':<30} {sum(row[1] for row in rows):>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Pluggable key-value storage for LegalAI Simplifier
+
+Session state only lives as long as a browser connection to one Streamlit
+process. Preferences and history are also written to a StorageBackend so
+they survive reconnects and, with the SQLite backend, are shared by every
+worker process on the host, as are cached analyses.
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config import STORAGE_CONFIG
+
+
+def _expiry(ttl_seconds: Optional[float]) -> Optional[float]:
+    """Absolute expiry time for a TTL, or None for no expiry"""
+    return time.time() + ttl_seconds if ttl_seconds else None
+
+
+class StorageBackend(ABC):
+    """JSON values stored under (namespace, key)"""
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Stored value, or None if missing or expired"""
+
+    @abstractmethod
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, replacing any existing one"""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str):
+        """Remove a value if present"""
+
+    @abstractmethod
+    def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Any]]:
+        """(key, value) pairs whose key starts with prefix, oldest write first"""
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class MemoryStorage(StorageBackend):
+    """In-process backend shared by the sessions of one server process
+
+    Holds at most max_entries values, dropping the least recently written
+    first, and removes expired values on writes as well as on reads.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, purge_interval: Optional[float] = None):
+        self.max_entries = max_entries or STORAGE_CONFIG["memory_max_entries"]
+        self.purge_interval = STORAGE_CONFIG["purge_interval"] if purge_interval is None else purge_interval
+        self._values: Dict[Tuple[str, str], Tuple[str, Optional[float]]] = {}
+        self._lock = threading.Lock()
+        self._next_purge = 0.0
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._values.get((namespace, key))
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] < time.time():
+                del self._values[(namespace, key)]
+                return None
+        return json.loads(entry[0])
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            # Re-inserting moves the key to the end so scans stay in write order
+            self._values.pop((namespace, key), None)
+            self._values[(namespace, key)] = (payload, _expiry(ttl_seconds))
+
+            if now >= self._next_purge:
+                for expired in [name for name, (_, expires_at) in self._values.items()
+                                if expires_at is not None and expires_at < now]:
+                    del self._values[expired]
+                self._next_purge = now + self.purge_interval
+            while len(self._values) > self.max_entries:
+                del self._values[next(iter(self._values))]
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._values.pop((namespace, key), None)
+
+    def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entries = [
+                (key, payload) for (entry_namespace, key), (payload, expires_at) in self._values.items()
+                if entry_namespace == namespace and key.startswith(prefix)
+                and (expires_at is None or expires_at >= now)
+            ]
+        return [(key, json.loads(payload)) for key, payload in entries]
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite backend in WAL mode that worker processes on one host can share
+
+    WAL lets readers proceed while another process writes. Each process
+    keeps a small pool of connections so concurrent sessions don't contend
+    for one handle.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS kv (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL,
+            written_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+    """
+
+    def __init__(self, path: Optional[str] = None, pool_size: Optional[int] = None):
+        self.path = path or STORAGE_CONFIG["sqlite_path"]
+        self.pool_size = pool_size or STORAGE_CONFIG["pool_size"]
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        with self._connection() as connection:
+            connection.execute(self.SCHEMA)
+            connection.execute("CREATE INDEX IF NOT EXISTS kv_written ON kv (namespace, written_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a pooled connection configured for concurrent access"""
+        connection = sqlite3.connect(
+            self.path, timeout=STORAGE_CONFIG["busy_timeout"], check_same_thread=False, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, opening one if the pool isn't full yet"""
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.pool_size
+                if can_open:
+                    self._created += 1
+            connection = self._connect() if can_open else self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._connection() as connection:
+            row = connection.execute(
+                "SELECT value, expires_at FROM kv WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < time.time():
+                connection.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+                return None
+        return json.loads(row[0])
+
+    def put(self, namespace: str, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        payload = json.dumps(value, default=str)
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at, written_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, payload, _expiry(ttl_seconds), time.time())
+            )
+
+    def delete(self, namespace: str, key: str):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def scan(self, namespace: str, prefix: str = "") -> List[Tuple[str, Any]]:
+        # substr() rather than LIKE so "_" and "%" in keys are matched literally
+        with self._connection() as connection:
+            rows = connection.execute(
+                "SELECT key, value FROM kv WHERE namespace = ? AND substr(key, 1, ?) = ? "
+                "AND (expires_at IS NULL OR expires_at >= ?) ORDER BY written_at, rowid",
+                (namespace, len(prefix), prefix, time.time())
+            ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+def create_storage(backend: Optional[str] = None) -> StorageBackend:
+    """Build the configured storage backend"""
+    backend = backend or STORAGE_CONFIG["backend"]
+    if backend == "sqlite":
+        return SQLiteStorage()
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    """Storage backend shared by every session in this process"""
+    return create_storage()
+
+
+def get_shared_storage() -> Optional[StorageBackend]:
+    """The storage backend if other processes can read it, otherwise None
+
+    Caches already shared within the process gain nothing from writing
+    through to the in-memory backend.
+    """
+    storage = get_storage()
+    return None if isinstance(storage, MemoryStorage) else storage
@@ -1,43 +1,178 @@
 import streamlit as st
-import hashlib
-import time
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+import codecs
+import gzip
+import io
+import os
+import re
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 import json
 
+import numpy as np
+
+from classifier import get_document_classifier
+from config import AI_CONFIG, OCR_CONFIG
+from history import AnalysisHistory, HistoryRecord
+from matcher import get_legal_matcher
+from metrics import timed
+from storage import get_storage
+
+# Separates pages in extracted document text
+PAGE_BREAK = "\f"
+
+class DocumentTooLargeError(ValueError):
+    """Raised when a document exceeds the configured size limits"""
+
 class DocumentProcessor:
     """Handle document processing and analysis"""
 
     @staticmethod
-    def extract_text_from_pdf(file):
-        """Extract text from uploaded PDF file"""
-        # In a real implementation, you would use PyPDF2 or pdfplumber
-        return f"Sample extracted text from {file.name}"
+    def check_file_size(file, max_mb: Optional[float] = None) -> int:
+        """Return the file size in bytes, rejecting files over the limit"""
+        max_mb = AI_CONFIG["max_file_size"] if max_mb is None else max_mb
+        size = getattr(file, "size", None)
+        if size is None:
+            position = file.tell()
+            size = file.seek(0, os.SEEK_END)
+            file.seek(position)
+
+        if size > max_mb * 1024 * 1024:
+            raise DocumentTooLargeError(f"File is {size / (1024 * 1024):.1f} MB; the limit is {max_mb} MB")
+        return size
+
+    @staticmethod
+    def stream_pdf_pages(file, max_chars: Optional[int] = AI_CONFIG["max_document_length"]) -> Iterator[Tuple[int, str]]:
+        """Yield (page_number, text) one page at a time, enforcing size limits as it goes"""
+        from pypdf import PdfReader
+
+        DocumentProcessor.check_file_size(file)
+        reader = PdfReader(file)
+        total_chars = 0
+
+        for page_number, page in enumerate(reader.pages, 1):
+            text = page.extract_text() or ""
+            total_chars += len(text)
+            if max_chars is not None and total_chars > max_chars:
+                raise DocumentTooLargeError(
+                    f"Document exceeds {max_chars:,} characters at page {page_number}"
+                )
+            yield page_number, text
+
+    @staticmethod
+    def extract_text_from_pdf(file, max_chars: Optional[int] = AI_CONFIG["max_document_length"]) -> str:
+        """Extract text from uploaded PDF file, pages separated by form feeds"""
+        return PAGE_BREAK.join(text for _, text in DocumentProcessor.stream_pdf_pages(file, max_chars))
+
+    @staticmethod
+    def extract_text_from_txt(file, max_chars: Optional[int] = AI_CONFIG["max_document_length"],
+                              chunk_size: int = 64 * 1024) -> str:
+        """Decode an uploaded text file in chunks, enforcing size limits as it goes"""
+        DocumentProcessor.check_file_size(file)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        parts, total_chars = [], 0
+
+        while True:
+            chunk = file.read(chunk_size)
+            text = decoder.decode(chunk, final=not chunk)
+            total_chars += len(text)
+            if max_chars is not None and total_chars > max_chars:
+                raise DocumentTooLargeError(f"Document exceeds {max_chars:,} characters")
+            parts.append(text)
+            if not chunk:
+                return "".join(parts)
+
+    @staticmethod
+    def extract_text_from_docx(file, max_chars: Optional[int] = AI_CONFIG["max_document_length"]) -> str:
+        """Extract paragraph text from an uploaded Word file, pages separated by form feeds
+
+        The document XML is parsed as a stream so size limits apply before a
+        large (or maliciously compressed) file is fully expanded.
+        """
+        import zipfile
+        from xml.etree import ElementTree
+
+        DocumentProcessor.check_file_size(file)
+        word = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+        try:
+            archive = zipfile.ZipFile(file)
+            body = archive.open("word/document.xml")
+        except (zipfile.BadZipFile, KeyError):
+            raise ValueError("File is not a readable Word document")
+
+        parts, paragraph, total_chars = [], [], 0
+        with archive, body:
+            for _, element in ElementTree.iterparse(body):
+                if element.tag == word + "t":
+                    paragraph.append(element.text or "")
+                elif element.tag == word + "tab":
+                    paragraph.append("\t")
+                elif element.tag == word + "br":
+                    paragraph.append(PAGE_BREAK if element.get(word + "type") == "page" else "\n")
+                elif element.tag == word + "p":
+                    text = "".join(paragraph)
+                    paragraph = []
+                    element.clear()
+                    total_chars += len(text) + 1
+                    if max_chars is not None and total_chars > max_chars:
+                        raise DocumentTooLargeError(f"Document exceeds {max_chars:,} characters")
+                    parts.append(text)
+        return "\n".join(parts)
+
+    @staticmethod
+    def read_uploaded_document(file, max_chars: Optional[int] = AI_CONFIG["max_document_length"]) -> str:
+        """Extract text from an uploaded file based on its extension"""
+        extension = os.path.splitext(file.name)[1].lower()
+        file.seek(0)
+        if extension == ".pdf":
+            return DocumentProcessor.extract_text_from_pdf(file, max_chars)
+        if extension in (".txt", ".md"):
+            return DocumentProcessor.extract_text_from_txt(file, max_chars)
+        if extension == ".docx":
+            return DocumentProcessor.extract_text_from_docx(file, max_chars)
+        if extension in OCR_CONFIG["image_formats"]:
+            text = DocumentProcessor.process_image(file)
+            if max_chars is not None and len(text) > max_chars:
+                raise DocumentTooLargeError(f"Document exceeds {max_chars:,} characters")
+            return text
+        raise ValueError(f"Text extraction for {extension} files is not supported yet")
 
     @staticmethod
-    def process_image(image_file):
-        """Process uploaded image files"""
-        # In a real implementation, you would use OCR libraries
-        return f"Sample OCR text from {image_file.name}"
+    def process_image(image_file) -> str:
+        """OCR uploaded image files, pages separated by form feeds"""
+        from ocr import get_ocr_engine
+
+        DocumentProcessor.check_file_size(image_file)
+        return PAGE_BREAK.join(get_ocr_engine().recognize(image_file))
 
     @staticmethod
     def classify_document_type(text: str) -> Tuple[str, float]:
         """Classify document type based on content"""
-        text_lower = text.lower()
-
-        # Simple keyword-based classification
-        if any(word in text_lower for word in ["nda", "non-disclosure", "confidential"]):
-            return "Non-Disclosure Agreement", 0.92
-        elif any(word in text_lower for word in ["lease", "rent", "tenant"]):
-            return "Lease Agreement", 0.88
-        elif any(word in text_lower for word in ["employment", "employee", "job"]):
-            return "Employment Contract", 0.85
-        else:
-            return "General Contract", 0.75
+        classifier = get_document_classifier()
+        doc_type, probability = classifier.classify(text)
+        return classifier.names[doc_type], probability
 
 class ConfidenceCalculator:
     """Calculate and manage AI confidence scores"""
 
+    # Adjustment based on document type certainty
+    TYPE_CONFIDENCE_MAP = {
+        "Non-Disclosure Agreement": 0.05,
+        "Lease Agreement": 0.03,
+        "Employment Contract": 0.02,
+        "General Contract": -0.05
+    }
+
+    # Different confidence levels based on clause complexity
+    CLAUSE_CONFIDENCE_MAP = {
+        "confidentiality": 0.9,
+        "termination": 0.85,
+        "payment": 0.92,
+        "liability": 0.78,
+        "intellectual_property": 0.82,
+        "non_compete": 0.75
+    }
+
     @staticmethod
     def calculate_base_confidence(text_length: int, keywords_found: int, document_type: str) -> float:
         """Calculate base confidence score"""
@@ -54,39 +189,58 @@ class ConfidenceCalculator:
         base_score += min(keywords_found * 0.02, 0.15)
 
         # Adjust based on document type certainty
-        type_confidence_map = {
-            "Non-Disclosure Agreement": 0.05,
-            "Lease Agreement": 0.03,
-            "Employment Contract": 0.02,
-            "General Contract": -0.05
-        }
-        base_score += type_confidence_map.get(document_type, 0)
+        base_score += ConfidenceCalculator.TYPE_CONFIDENCE_MAP.get(document_type, 0)
 
         return min(max(base_score, 0.3), 0.98)  # Clamp between 30% and 98%
 
     @staticmethod
     def calculate_clause_confidence(clause_type: str, context: str) -> float:
         """Calculate confidence for specific clauses"""
-        # Different confidence levels based on clause complexity
-        confidence_map = {
-            "confidentiality": 0.9,
-            "termination": 0.85,
-            "payment": 0.92,
-            "liability": 0.78,
-            "intellectual_property": 0.82,
-            "non_compete": 0.75
-        }
-
-        base_confidence = confidence_map.get(clause_type.lower(), 0.8)
+        base_confidence = ConfidenceCalculator.CLAUSE_CONFIDENCE_MAP.get(clause_type.lower(), 0.8)
 
         # Adjust based on context clarity
-        if len(context.split()) > 50:  # Detailed clause
+        word_count = len(context.split())
+        if word_count > 50:  # Detailed clause
             base_confidence += 0.05
-        elif len(context.split()) < 20:  # Vague clause
+        elif word_count < 20:  # Vague clause
             base_confidence -= 0.1
 
         return min(max(base_confidence, 0.4), 0.98)
 
+    @staticmethod
+    def _lookup(labels, table: Dict[str, float], default: float, lowercase: bool = False) -> np.ndarray:
+        """Map an array of labels through a table, touching each distinct label once"""
+        unique, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        values = np.array([table.get(label.lower() if lowercase else label, default) for label in unique])
+        return values[inverse] if len(unique) else np.zeros(0)
+
+    @staticmethod
+    def calculate_base_confidence_batch(text_lengths, keywords_found, document_types) -> np.ndarray:
+        """Vectorized calculate_base_confidence over arrays of documents"""
+        text_lengths = np.asarray(text_lengths)
+        keywords_found = np.asarray(keywords_found)
+
+        base_scores = np.full(text_lengths.shape, 0.7)
+        base_scores += np.where(text_lengths > 1000, 0.1, np.where(text_lengths > 500, 0.05, 0.0))
+        base_scores += np.minimum(keywords_found * 0.02, 0.15)
+        base_scores += ConfidenceCalculator._lookup(document_types, ConfidenceCalculator.TYPE_CONFIDENCE_MAP, 0.0)
+
+        return np.clip(base_scores, 0.3, 0.98)
+
+    @staticmethod
+    def calculate_clause_confidence_batch(clause_types, context_word_counts) -> np.ndarray:
+        """Vectorized calculate_clause_confidence; takes word counts instead of context strings"""
+        context_word_counts = np.asarray(context_word_counts)
+
+        confidences = ConfidenceCalculator._lookup(
+            clause_types, ConfidenceCalculator.CLAUSE_CONFIDENCE_MAP, 0.8, lowercase=True
+        )
+        confidences = confidences + np.where(
+            context_word_counts > 50, 0.05, np.where(context_word_counts < 20, -0.1, 0.0)
+        )
+
+        return np.clip(confidences, 0.4, 0.98)
+
 class RiskAssessor:
     """Assess risks in legal documents"""
 
@@ -106,15 +260,16 @@ class RiskAssessor:
     }
 
     @staticmethod
+    @timed("assess_document_risk")
     def assess_document_risk(text: str, document_type: str) -> List[Dict]:
         """Assess overall document risk"""
-        text_lower = text.lower()
+        hits = get_legal_matcher().scan(text)
         risks = []
 
-        # Check for high-risk patterns
-        high_risk_count = sum(1 for keyword in RiskAssessor.RISK_KEYWORDS["high"] if keyword in text_lower)
-        medium_risk_count = sum(1 for keyword in RiskAssessor.RISK_KEYWORDS["medium"] if keyword in text_lower)
-        low_risk_count = sum(1 for keyword in RiskAssessor.RISK_KEYWORDS["low"] if keyword in text_lower)
+        # Count distinct keywords found per risk level in a single pass
+        high_risk_count = len(hits.get(("risk_level", "high"), {}))
+        medium_risk_count = len(hits.get(("risk_level", "medium"), {}))
+        low_risk_count = len(hits.get(("risk_level", "low"), {}))
 
         if high_risk_count > 2:
             risks.append({
@@ -155,8 +310,14 @@ class VoiceInterface:
     }
 
     @staticmethod
-    def process_voice_question(question: str, document_context: str) -> Dict:
-        """Process voice question and generate response"""
+    def process_voice_question(question: str, document_context, top_k: int = 3) -> Dict:
+        """Process voice question and generate response
+
+        document_context is the document text or a prebuilt RetrievalIndex;
+        pass the index to reuse it across follow-up questions.
+        """
+        from retrieval import RetrievalIndex
+
         question_lower = question.lower()
 
         # Determine question type
@@ -169,13 +330,34 @@ class VoiceInterface:
         # Generate appropriate response
         response = VoiceInterface._generate_response(question_type, question, document_context)
 
+        # Ground the answer in the clauses most relevant to the question
+        index = document_context if isinstance(document_context, RetrievalIndex) else RetrievalIndex(document_context or "")
+        relevant_clauses = VoiceInterface.find_relevant_clauses(index, question, top_k)
+
         return {
             "question": question,
-            "response": response["text"],
+            "response": VoiceInterface.cite_clauses(response["text"], relevant_clauses),
             "confidence": response["confidence"],
-            "suggestions": response["suggestions"]
+            "suggestions": response["suggestions"],
+            "relevant_clauses": relevant_clauses
         }
 
+    @staticmethod
+    def find_relevant_clauses(index, question: str, top_k: int = 3) -> List[Dict]:
+        """Top-k clauses of the indexed document for a question"""
+        return [
+            {"citation": hit.citation, "excerpt": hit.excerpt, "confidence": int(round(hit.confidence * 100))}
+            for hit in index.search(question, top_k)
+        ]
+
+    @staticmethod
+    def cite_clauses(text: str, relevant_clauses: List[Dict]) -> str:
+        """Append the best matching clause to a response"""
+        if not relevant_clauses:
+            return text
+        best = relevant_clauses[0]
+        return f"{text} The most relevant part of your document is {best['citation']} ({best['confidence']}% match): \"{best['excerpt']}\""
+
     @staticmethod
     def _generate_response(question_type: str, question: str, context: str) -> Dict:
         """Generate response based on question type"""
@@ -213,52 +395,151 @@ class DataExporter:
     """Handle data export functionality"""
 
     @staticmethod
-    def generate_pdf_report(analysis_data: Dict) -> str:
-        """Generate PDF report (simulated)"""
-        # In real implementation, would use libraries like reportlab
-        return f"PDF report generated for {analysis_data['document_type']} analysis"
+    def generate_pdf_report(analysis_data: Dict) -> bytes:
+        """Generate a PDF report of an analysis"""
+        # reportlab is imported on first use to keep it out of app start-up
+        from reports import render_pdf_report
+        return render_pdf_report(analysis_data)
 
     @staticmethod
     def generate_summary_email(analysis_data: Dict, user_email: str) -> str:
         """Generate email summary (simulated)"""
         return f"Summary email sent to {user_email} for document analysis"
 
+    # Compression picked from an export file's extension when not given
+    COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
     @staticmethod
-    def export_to_json(analysis_data: Dict) -> str:
-        """Export analysis to JSON format"""
-        return json.dumps(analysis_data, indent=2)
+    def json_default(value):
+        """Convert NumPy scalars and arrays to plain JSON types"""
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def export_to_json(analysis_data: Dict, indent: Optional[int] = 2) -> str:
+        """Export analysis to JSON format (indent=None gives a single JSONL line)"""
+        separators = (",", ":") if indent is None else None
+        return json.dumps(analysis_data, indent=indent, separators=separators, default=DataExporter.json_default)
+
+    @staticmethod
+    @contextmanager
+    def open_export(destination, compression: Optional[str] = None) -> Iterator[TextIO]:
+        """Text stream over a path or binary buffer, optionally gzip/zstd compressed
+
+        A path's extension (.gz, .zst) selects compression when none is given.
+        Buffers such as io.BytesIO are left open for the caller to read.
+        """
+        owns_file = isinstance(destination, (str, os.PathLike))
+        if compression is None and owns_file:
+            compression = DataExporter.COMPRESSION_SUFFIXES.get(os.path.splitext(destination)[1].lower())
+
+        raw = open(destination, "wb") if owns_file else destination
+        try:
+            if compression == "gzip":
+                binary = gzip.GzipFile(fileobj=raw, mode="wb")
+            elif compression == "zstd":
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ValueError("zstd compression requires the zstandard package")
+                binary = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            elif compression is None:
+                binary = raw
+            else:
+                raise ValueError(f"Unsupported compression: {compression}")
+
+            stream = io.TextIOWrapper(binary, encoding="utf-8", newline="\n")
+            try:
+                yield stream
+            finally:
+                stream.flush()
+                stream.detach()
+                if binary is not raw:
+                    binary.close()
+        finally:
+            if owns_file:
+                raw.close()
+
+    @staticmethod
+    def stream_jsonl(analyses: Iterable[Dict], destination, compression: Optional[str] = None) -> int:
+        """Write analyses one compact JSON line at a time; returns the number written"""
+        count = 0
+        with DataExporter.open_export(destination, compression) as stream:
+            for analysis in analyses:
+                stream.write(DataExporter.export_to_json(analysis, indent=None))
+                stream.write("\n")
+                count += 1
+        return count
+
+    @staticmethod
+    def stream_json_array(analyses: Iterable[Dict], destination, compression: Optional[str] = None) -> int:
+        """Write analyses as one JSON array without building it in memory"""
+        count = 0
+        with DataExporter.open_export(destination, compression) as stream:
+            stream.write("[")
+            for analysis in analyses:
+                stream.write(",\n" if count else "\n")
+                stream.write(DataExporter.export_to_json(analysis, indent=None))
+                count += 1
+            stream.write("\n]\n" if count else "]\n")
+        return count
 
 class SessionManager:
     """Manage user sessions and preferences"""
 
+    DEFAULT_PREFERENCES = {
+        "complexity_level": "Moderate",
+        "jurisdiction": "California",
+        "user_type": "Small Business Owner",
+        "language": "English"
+    }
+
     @staticmethod
     def initialize_session():
-        """Initialize session state variables"""
+        """Initialize session state variables, restoring stored ones"""
+        storage = get_storage()
+
+        if "user_id" not in st.session_state:
+            # The ID travels in the URL, so a reconnect to any worker finds the same stored state.
+            # It is also the only credential for that state: whoever has the link shares it
+            user_id = st.query_params.get("sid", "")
+            if not re.fullmatch(r"[0-9a-f]{32}", user_id):
+                user_id = uuid.uuid4().hex
+                st.query_params["sid"] = user_id
+            st.session_state.user_id = user_id
+        user_id = st.session_state.user_id
+
         if "user_preferences" not in st.session_state:
             st.session_state.user_preferences = {
-                "complexity_level": "Moderate",
-                "jurisdiction": "California",
-                "user_type": "Small Business Owner",
-                "language": "English"
+                **SessionManager.DEFAULT_PREFERENCES,
+                **(storage.get("preferences", user_id) or {})
             }
 
         if "analysis_history" not in st.session_state:
-            st.session_state.analysis_history = []
+            history = AnalysisHistory()
+            for _, data in storage.scan("history", f"{user_id}/"):
+                history.append(HistoryRecord.from_dict(data))
+            st.session_state.analysis_history = history
 
         if "voice_history" not in st.session_state:
             st.session_state.voice_history = []
 
     @staticmethod
-    def save_analysis(analysis_data: Dict):
-        """Save analysis to session history"""
-        analysis_data["timestamp"] = datetime.now().isoformat()
-        analysis_data["session_id"] = hashlib.md5(str(time.time()).encode()).hexdigest()[:8]
-
-        st.session_state.analysis_history.append(analysis_data)
-
-        # Keep only last 10 analyses
-        if len(st.session_state.analysis_history) > 10:
-            st.session_state.analysis_history = st.session_state.analysis_history[-10:]
+    def save_analysis(analysis_data: Dict) -> HistoryRecord:
+        """Save a compact summary of an analysis to session history and shared storage"""
+        history = st.session_state.analysis_history
+        record = history.append(HistoryRecord.from_analysis(analysis_data))
+
+        storage = get_storage()
+        prefix = f"{st.session_state.user_id}/"
+        storage.put("history", prefix + record.record_id, record.to_dict())
+        stored = storage.scan("history", prefix)
+        for key, _ in stored[:max(len(stored) - history.capacity, 0)]:
+            storage.delete("history", key)
+        return record
 
     @staticmethod
     def get_user_preferences() -> Dict:
@@ -267,5 +548,8 @@ class SessionManager:
 
     @staticmethod
     def update_user_preferences(preferences: Dict):
-        """Update user preferences"""
-        st.session_state.user_preferences.update(preferences)
\ No newline at end of file
+        """Update user preferences, persisting them when they change"""
+        current = st.session_state.user_preferences
+        if any(current.get(name) != value for name, value in preferences.items()):
+            current.update(preferences)
+            get_storage().put("preferences", st.session_state.user_id, current)
\ No newline at end of file